@@ -0,0 +1,74 @@
+# benchmarks/bench_ingestion.py
+#
+# Compares a serial loop of parse_columns with the parallel ingestion
+# stage, which runs the same projected parse on its process pool. The disk
+# cache is disabled, so both sides parse every file.
+# Usage: python benchmarks/bench_ingestion.py [--files 50] [--rows 200000] [--cols 20]
+
+import os
+os.environ['DATAVIZ_DISK_CACHE'] = '0'
+
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plots.data_cache import dataset_cache
+from plots.ingestion import DEFAULT_MAX_WORKERS, load_files_parallel, parse_columns, shutdown_executor
+
+
+def write_files(directory, n_files, n_rows, n_cols):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(n_files):
+        data = rng.standard_normal((n_rows, n_cols))
+        data[:, 0] = np.arange(n_rows)
+        path = os.path.join(directory, f"data_{i:03d}.csv")
+        pd.DataFrame(data, columns=[f"ch{j}" for j in range(n_cols)]).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def serial_load(paths, x_col, y_col):
+    return [parse_columns(path, x_col, y_col) for path in paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--cols', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS)
+    args = parser.parse_args()
+
+    plot_details = {'x_axis_col': '1', 'y_axis_col': '2'}
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.files} files ({args.rows} rows x {args.cols} columns)...")
+        paths = write_files(directory, args.files, args.rows, args.cols)
+
+        start = time.perf_counter()
+        serial_load(paths, 0, 1)
+        serial_time = time.perf_counter() - start
+
+        dataset_cache.clear()
+        # Start the pool up front so process spawn time is not counted
+        load_files_parallel(paths[:2], plot_details, max_workers=args.workers)
+        dataset_cache.clear()
+
+        start = time.perf_counter()
+        load_files_parallel(paths, plot_details, max_workers=args.workers)
+        parallel_time = time.perf_counter() - start
+        shutdown_executor()
+
+    print(f"serial:   {serial_time:.2f} s")
+    print(f"parallel: {parallel_time:.2f} s ({args.workers} workers)")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
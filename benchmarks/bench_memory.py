@@ -0,0 +1,95 @@
+# benchmarks/bench_memory.py
+#
+# Checks that memory stays flat over a long session under Agg: repeated
+# re-plots of preloaded data with text items, plus expanded views that are
+# opened from a snapshot and closed again. Prints the traced Python memory
+# after each block of cycles and any released figure that is still alive.
+#
+# Usage:
+#   python benchmarks/bench_memory.py [--cycles 200] [--files 5] [--points 200000]
+
+import os
+os.environ['DATAVIZ_DISK_CACHE'] = '0'
+
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.text import Text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plots.annotations import AnnotationRegistry
+from plots.batch import DEFAULT_AXIS_DETAILS, DEFAULT_PLOT_DETAILS, DEFAULT_PLOT_VISUALS
+from plots.export import draw_snapshot, snapshot
+from plots.lifecycle import figure_registry, format_bytes
+from plots.plotting import plot_data
+
+
+def make_datasets(n_files, n_points):
+    rng = np.random.default_rng(n_files)
+    x = np.linspace(0, 100, n_points)
+    return [(x, np.cumsum(rng.standard_normal(n_points))) for _ in range(n_files)]
+
+
+def replot(figure, files, datasets, text_items):
+    # What MainWindow.render_plot does with the text items
+    plot_data(figure, files, DEFAULT_PLOT_DETAILS, DEFAULT_AXIS_DETAILS, DEFAULT_PLOT_VISUALS, datasets=datasets)
+    ax = figure.gca()
+    text_items = [Text(*t.get_position(), t.get_text(), fontsize=t.get_fontsize(), color=t.get_color(), ha='left')
+                  for t in text_items]
+    for text_item in text_items:
+        ax.add_artist(text_item)
+    figure.canvas.draw()
+    return text_items
+
+
+def expand(figure, text_items):
+    expanded = figure_registry.new_figure('expanded', figsize=(12, 8))
+    FigureCanvasAgg(expanded)
+    draw_snapshot(expanded, snapshot(figure, AnnotationRegistry(), text_items))
+    expanded.canvas.draw()
+    figure_registry.release(expanded)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--points', type=int, default=200000)
+    args = parser.parse_args()
+
+    datasets = make_datasets(args.files, args.points)
+    files = [f"series_{i}.csv" for i in range(args.files)]
+    figure = figure_registry.new_figure('main', figsize=(8, 6))
+    FigureCanvasAgg(figure)
+    text_items = [Text(10, 0, "label", fontsize=12, color='black', ha='left')]
+
+    tracemalloc.start()
+    block = max(args.cycles // 10, 1)
+    baseline = None
+    for cycle in range(1, args.cycles + 1):
+        text_items = replot(figure, files, datasets, text_items)
+        if cycle % 5 == 0:
+            expand(figure, text_items)
+        if cycle % block == 0:
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            baseline = current if baseline is None else baseline
+            print(f"cycle {cycle:5d}: current={format_bytes(current):>10s}  peak={format_bytes(peak):>10s}  "
+                  f"growth={format_bytes(max(current - baseline, 0)):>10s}")
+
+    print(figure_registry.format_report())
+    figure_registry.release_all()
+    leaked = figure_registry.leaked()
+    print(f"released figures still alive: {leaked or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# benchmarks/bench_plotting.py
+#
+# Times the stages of plot_data on synthetic CSV files under Agg:
+#   parse      pd.read_csv of the whole file
+#   projected  parse_columns (X/Y columns only, compact dtypes)
+#   extract    pulling the X/Y columns out of the parsed DataFrame
+#   artists    plot_data with preloaded data, without drawing
+#   draw       canvas.draw()
+# for every plot type in 2D and 3D, over several file sizes and widths.
+#
+# Usage:
+#   python benchmarks/bench_plotting.py [--output results.json]
+#   python benchmarks/bench_plotting.py --compare baseline.json [--threshold 0.2]
+#
+# Results are written as JSON (by default to benchmarks/results/). With
+# --compare, any stage slower than the baseline by more than the threshold
+# is reported as a regression and the exit status is 1.
+
+import os
+os.environ['DATAVIZ_DISK_CACHE'] = '0'
+
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plots.batch import DEFAULT_AXIS_DETAILS, DEFAULT_PLOT_DETAILS, DEFAULT_PLOT_VISUALS
+from plots.data_cache import dataset_cache
+from plots.ingestion import parse_columns
+from plots.plotting import plot_data
+
+PLOT_TYPES = ['Line', 'Bar', 'Scatter', 'Histogram', 'Pie']
+DEFAULT_ROWS = [1000, 100000, 1000000]
+DEFAULT_COLS = [2, 50]
+# Pie draws one wedge per row, so larger files are skipped; bars are
+# aggregated and run at every size
+MAX_PIE_ROWS = 10000
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class NoDrawCanvas(FigureCanvasAgg):
+    # Keeps plot_data's draw_idle from drawing, so artist creation is timed alone
+    def draw_idle(self, *args, **kwargs):
+        pass
+
+
+def write_csv(directory, n_rows, n_cols):
+    rng = np.random.default_rng(n_rows + n_cols)
+    data = rng.standard_normal((n_rows, n_cols)).cumsum(axis=0)
+    data[:, 0] = np.arange(n_rows)
+    data[:, 1] = np.abs(data[:, 1]) + 1
+    path = os.path.join(directory, f"bench_{n_rows}x{n_cols}.csv")
+    pd.DataFrame(data, columns=[f"ch{j}" for j in range(n_cols)]).to_csv(path, index=False)
+    return path
+
+
+def timed(func, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def bench_file(path, n_rows, repeat, results):
+    parse_time, df = timed(lambda: pd.read_csv(path), repeat)
+    projected_time, _ = timed(lambda: parse_columns(path, 0, 1), repeat)
+    extract_time, (x, y) = timed(lambda: (df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy()), repeat)
+
+    for plot_type in PLOT_TYPES:
+        if plot_type == 'Pie' and n_rows > MAX_PIE_ROWS:
+            continue
+        for is_3d in (False, True):
+            if plot_type == 'Pie' and is_3d:
+                continue
+            visuals = dict(DEFAULT_PLOT_VISUALS, plot_type=plot_type)
+            figure = Figure(figsize=(8, 6))
+            canvas = NoDrawCanvas(figure)
+
+            def render():
+                plot_data(figure, [path], DEFAULT_PLOT_DETAILS, DEFAULT_AXIS_DETAILS, visuals,
+                          is_3d=is_3d, datasets=[(x, y)])
+
+            artists_time, _ = timed(render, repeat)
+            draw_time, _ = timed(canvas.draw, repeat)
+            key = f"{plot_type.lower()}/{'3d' if is_3d else '2d'}/{os.path.basename(path)}"
+            results[key] = {
+                'parse': parse_time,
+                'projected': projected_time,
+                'extract': extract_time,
+                'artists': artists_time,
+                'draw': draw_time,
+            }
+            print(f"{key:40s} " + "  ".join(f"{stage}={value * 1000:8.1f}ms" for stage, value in results[key].items()))
+
+
+def compare(results, baseline, threshold, min_delta=0.005):
+    regressions = []
+    for key, stages in results.items():
+        old_stages = baseline.get(key)
+        if old_stages is None:
+            continue
+        for stage, value in stages.items():
+            old = old_stages.get(stage)
+            if old is not None and value > old * (1 + threshold) and value - old > min_delta:
+                regressions.append((key, stage, old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--cols', type=int, nargs='+', default=DEFAULT_COLS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', help="baseline results file to check against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative slowdown (default: 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n_rows in args.rows:
+            for n_cols in args.cols:
+                path = write_csv(directory, n_rows, n_cols)
+                dataset_cache.clear()
+                bench_file(path, n_rows, args.repeat, results)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'matplotlib': matplotlib.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for key, stage, old, new in regressions:
+            print(f"REGRESSION {key} {stage}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_startup.py
+#
+# Measures cold-start time to an interactive main window: from interpreter
+# start until the Qt event loop first runs with the window shown.
+# Usage: python benchmarks/bench_startup.py [--runs 5]
+#
+# Without a display, the Qt "offscreen" platform is used.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child():
+    start = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(REPO_DIR)
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+
+    from gui.splash_screen import SplashScreen
+    from main import initialize
+
+    app = QApplication(sys.argv[:1])
+    splash = SplashScreen()
+    splash.show()
+    app.processEvents()
+    window = initialize(app, splash)
+    window.show()
+    splash.close()
+
+    def report():
+        print(json.dumps({
+            'interactive_s': time.perf_counter() - start,
+            'pandas_imported': 'pandas' in sys.modules,
+            'mplot3d_imported': 'mpl_toolkits.mplot3d' in sys.modules,
+        }))
+        app.quit()
+
+    QTimer.singleShot(0, report)
+    app.exec_()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and sys.platform.startswith('linux'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    in_process = []
+    wall = []
+    result = {}
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child'],
+            env=env, cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        wall.append(time.perf_counter() - start)
+        result = json.loads(output.strip().splitlines()[-1])
+        in_process.append(result['interactive_s'])
+
+    print(f"time to interactive (median of {args.runs}): {statistics.median(in_process):.3f} s")
+    print(f"process wall time   (median of {args.runs}): {statistics.median(wall):.3f} s")
+    print(f"pandas imported at startup: {result['pandas_imported']}")
+    print(f"mplot3d imported at startup: {result['mplot3d_imported']}")
+
+
+if __name__ == "__main__":
+    main()
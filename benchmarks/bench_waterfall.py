@@ -0,0 +1,79 @@
+# benchmarks/bench_waterfall.py
+#
+# Times building and rotating 3D waterfall plots under Agg: plot_data with
+# preloaded traces, then one full draw per camera angle, for several trace
+# counts.
+#
+# Usage:
+#   python benchmarks/bench_waterfall.py [--traces 100 500] [--points 5000]
+
+import os
+os.environ['DATAVIZ_DISK_CACHE'] = '0'
+
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plots.batch import DEFAULT_AXIS_DETAILS, DEFAULT_PLOT_DETAILS, DEFAULT_PLOT_VISUALS
+from plots.plotting import plot_data
+
+# Camera azimuths drawn to simulate a rotation
+AZIMUTHS = range(-60, 300, 30)
+
+
+def make_traces(n_traces, n_points):
+    rng = np.random.default_rng(n_traces)
+    x = np.linspace(0, 100, n_points)
+    datasets = []
+    for i in range(n_traces):
+        peak = rng.uniform(20, 80)
+        y = np.exp(-((x - peak) / 5) ** 2) + 0.05 * rng.standard_normal(n_points)
+        datasets.append((x, y))
+    return datasets
+
+
+def bench(n_traces, n_points, plot_type):
+    datasets = make_traces(n_traces, n_points)
+    files = [f"trace_{i}.csv" for i in range(n_traces)]
+    visuals = dict(DEFAULT_PLOT_VISUALS, plot_type=plot_type, apply_legends=False)
+    figure = Figure(figsize=(8, 6))
+    canvas = FigureCanvasAgg(figure)
+
+    start = time.perf_counter()
+    plot_data(figure, files, DEFAULT_PLOT_DETAILS, DEFAULT_AXIS_DETAILS, visuals, is_3d=True, datasets=datasets)
+    build = time.perf_counter() - start
+
+    ax = figure.axes[0]
+    frames = []
+    for azim in AZIMUTHS:
+        ax.view_init(elev=30, azim=azim)
+        start = time.perf_counter()
+        canvas.draw()
+        frames.append(time.perf_counter() - start)
+    frame = statistics.median(frames)
+    print(f"{plot_type.lower():8s} {n_traces:5d} traces x {n_points} points: "
+          f"build={build * 1000:8.1f}ms  frame={frame * 1000:8.1f}ms  ({1 / frame:5.1f} fps)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--traces', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--points', type=int, default=5000)
+    args = parser.parse_args()
+    for plot_type in ('Line', 'Scatter'):
+        for n_traces in args.traces:
+            bench(n_traces, args.points, plot_type)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# gui/annotation_preview.py
+
+from matplotlib.lines import Line2D
+
+
+class AnnotationPreview:
+    """Blitted cursor preview for the annotation tools.
+
+    The figure without the preview is cached as a background on every full
+    draw. Mouse moves then only restore that background, move one persistent
+    animated artist and blit it, so the data series are never redrawn while
+    the cursor moves. Full redraws happen only when an annotation is added.
+    """
+
+    STYLES = {
+        'vline': dict(color='r', linestyle='--'),
+        'hline': dict(color='b', linestyle='--'),
+        'point': dict(marker='*', color='black', markersize=10, linestyle=''),
+    }
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.mode = None
+        self.artist = None
+        self.background = None
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def set_mode(self, mode):
+        if mode == self.mode:
+            return
+        self.remove_artist()
+        self.mode = mode
+        self.restore_background()
+
+    def remove_artist(self):
+        if self.artist is not None:
+            if self.artist.axes is not None and self.artist in self.artist.axes.lines:
+                self.artist.remove()
+            self.artist = None
+
+    def ensure_artist(self, ax, x, y):
+        # The artist is lost whenever plot_data clears the figure
+        if self.artist is not None and self.artist.axes is ax and self.artist in ax.lines:
+            return self.artist
+        self.artist = None
+        style = self.STYLES[self.mode]
+        # Built at the cursor and added with add_artist, which leaves the
+        # data limits alone; axvline/axhline/plot would pull the view
+        # towards the preview position on the next autoscale
+        if self.mode == 'vline':
+            self.artist = Line2D([x, x], [0, 1], transform=ax.get_xaxis_transform(), animated=True, **style)
+        elif self.mode == 'hline':
+            self.artist = Line2D([0, 1], [y, y], transform=ax.get_yaxis_transform(), animated=True, **style)
+        else:
+            self.artist = Line2D([x], [y], transform=ax.transData, animated=True, **style)
+        ax.add_artist(self.artist)
+        self.artist.set_visible(False)
+        return self.artist
+
+    def on_draw(self, event):
+        # Cache the figure as drawn without the animated preview
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self.artist is not None and self.artist.get_visible() and self.artist.axes is not None:
+            self.artist.axes.draw_artist(self.artist)
+
+    def restore_background(self):
+        if self.background is not None:
+            self.canvas.restore_region(self.background)
+            self.canvas.blit(self.figure.bbox)
+
+    def update(self, event):
+        if self.mode is None or self.background is None:
+            return
+        if event.inaxes is None or event.xdata is None or event.ydata is None:
+            if self.artist is not None and self.artist.get_visible():
+                self.artist.set_visible(False)
+                self.restore_background()
+            return
+
+        artist = self.ensure_artist(event.inaxes, event.xdata, event.ydata)
+        if self.mode == 'vline':
+            artist.set_xdata([event.xdata, event.xdata])
+        elif self.mode == 'hline':
+            artist.set_ydata([event.ydata, event.ydata])
+        else:
+            artist.set_data([event.xdata], [event.ydata])
+        artist.set_visible(True)
+
+        self.canvas.restore_region(self.background)
+        event.inaxes.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
@@ -0,0 +1,69 @@
+# gui/canvas.py
+
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+
+from plots.profiling import tracer
+
+
+class TimedFigureCanvas(FigureCanvasQTAgg):
+    """Qt canvas that records its Agg render and Qt paint times as spans."""
+
+    def draw(self):
+        with tracer.span('canvas.draw'):
+            super().draw()
+
+    def paintEvent(self, event):
+        with tracer.span('canvas.paint'):
+            super().paintEvent(event)
+
+
+class PerformanceOverlay(QLabel):
+    """Translucent label over the canvas listing the latest span timings.
+
+    It is a Qt widget rather than a Matplotlib artist, so updating it never
+    triggers another figure draw.
+    """
+
+    span_recorded = pyqtSignal()
+
+    def __init__(self, canvas):
+        super().__init__(canvas)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #7CFC00;"
+            "font-family: monospace; font-size: 10px; padding: 4px; border-radius: 3px;"
+        )
+        self.move(8, 8)
+        self.hide()
+        # Coalesce bursts of spans into one refresh
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(100)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.span_recorded.connect(self.refresh_timer.start)
+
+    def set_enabled(self, enabled):
+        if enabled:
+            tracer.add_listener(self.on_span)
+            self.refresh()
+            self.show()
+            self.raise_()
+        else:
+            tracer.remove_listener(self.on_span)
+            self.hide()
+
+    def toggle(self):
+        self.set_enabled(not self.isVisible())
+
+    def on_span(self, event):
+        # Spans can be recorded from worker threads; the signal is queued
+        # to the GUI thread. Paints are skipped since the overlay causes them.
+        if event['name'] != 'canvas.paint':
+            self.span_recorded.emit()
+
+    def refresh(self):
+        lines = [f"{name:<34s}{duration * 1000:9.1f} ms" for name, duration in tracer.latest().items()]
+        self.setText("\n".join(lines) if lines else "No timings yet")
+        self.adjustSize()
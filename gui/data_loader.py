@@ -0,0 +1,57 @@
+# gui/data_loader.py
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from plots.ingestion import load_files_parallel
+
+
+class DataLoadWorker(QThread):
+    """Parses the selected files off the GUI thread.
+
+    Files are parsed concurrently on the ingestion process pool. Each file
+    is streamed back through ``file_loaded`` (or ``file_failed``) as soon as
+    it is done, whatever its position in the list, and ``progress`` follows
+    every finished file. ``loading_finished`` carries the full list of
+    (x, y) pairs in the original file order once every file is done.
+    """
+
+    file_loaded = pyqtSignal(int, str, object)
+    file_failed = pyqtSignal(int, str, str)
+    progress = pyqtSignal(int, int)
+    loading_finished = pyqtSignal(list)
+
+    def __init__(self, data_files, plot_details, histogram=False, parent=None):
+        super().__init__(parent)
+        self.data_files = list(data_files)
+        self.plot_details = dict(plot_details)
+        self.histogram = histogram
+        self._cancelled = False
+        self._done = 0
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        total = len(self.data_files)
+        self._done = 0
+        self.progress.emit(0, total)
+        datasets = load_files_parallel(
+            self.data_files, self.plot_details,
+            on_result=self.on_result, is_cancelled=self.is_cancelled,
+            histogram=self.histogram
+        )
+        if not self._cancelled:
+            self.loading_finished.emit(datasets)
+
+    def on_result(self, index, file_path, dataset, error):
+        if self._cancelled:
+            return
+        if error is not None:
+            self.file_failed.emit(index, file_path, str(error))
+        else:
+            self.file_loaded.emit(index, file_path, dataset)
+        self._done += 1
+        self.progress.emit(self._done, len(self.data_files))
@@ -0,0 +1,136 @@
+# gui/data_view.py
+
+import os
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableView, QHeaderView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, pyqtSignal
+
+from plots.table_source import open_table_source, index_csv_rows, describe_source, CsvTableSource
+
+
+class DatasetTableModel(QAbstractTableModel):
+    """Table model over a TableSource.
+
+    The view only asks for visible cells. Until a CSV has been indexed,
+    further rows are pulled in through canFetchMore/fetchMore as the user
+    scrolls; once it has, every row is announced and read on demand.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.source.loaded_rows()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.source.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return str(self.source.value(index.row(), index.column()))
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return f"{self.source.columns[section]}\n({self.source.dtypes[section]})"
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.source.can_fetch_more()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        first = self.source.loaded_rows()
+        # Read the chunk before announcing the new rows
+        added = self.source.fetch_more()
+        if added:
+            self.beginInsertRows(QModelIndex(), first, first + added - 1)
+            self.endInsertRows()
+
+    def set_index(self, total, chunk_offsets):
+        first = self.source.loaded_rows()
+        if total > first:
+            self.beginInsertRows(QModelIndex(), first, total - 1)
+            self.source.set_index(total, chunk_offsets)
+            self.endInsertRows()
+        else:
+            self.beginResetModel()
+            self.source.set_index(total, chunk_offsets)
+            self.endResetModel()
+
+
+class RowIndexWorker(QThread):
+    # Counts the rows of a CSV without parsing it and indexes their offsets
+    indexed = pyqtSignal(int, list)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            result = index_csv_rows(self.file_path, is_cancelled=self.isInterruptionRequested)
+        except OSError as e:
+            print(f"Error counting rows of {self.file_path}: {e}")
+            return
+        # None when the window closed during the scan
+        if result is not None:
+            self.indexed.emit(*result)
+
+
+class DataStructureWindow(QWidget):
+    def __init__(self, file_paths, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Data Structure")
+        self.data_layout = QVBoxLayout(self)
+        self.sources = []
+        self.count_workers = []
+
+        for file_path in file_paths:
+            try:
+                source = open_table_source(file_path)
+            except Exception as e:
+                print(f"Error loading file {file_path}: {e}")
+                continue
+            self.sources.append(source)
+
+            info_label = QLabel()
+            name = os.path.basename(file_path)
+            info_label.setText(f"{name} - {describe_source(source)}")
+
+            table = QTableView()
+            model = DatasetTableModel(source, table)
+            table.setModel(model)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+            self.data_layout.addWidget(info_label)
+            self.data_layout.addWidget(table)
+
+            if isinstance(source, CsvTableSource) and source.total_rows() is None:
+                worker = RowIndexWorker(file_path, self)
+                worker.indexed.connect(
+                    lambda total, offsets, model=model, label=info_label, name=name:
+                        self.on_rows_indexed(model, label, name, total, offsets)
+                )
+                self.count_workers.append(worker)
+                worker.start()
+
+        self.setGeometry(100, 100, 800, 600)
+
+    def on_rows_indexed(self, model, label, name, total, offsets):
+        model.set_index(total, offsets)
+        label.setText(f"{name} - {describe_source(model.source)}")
+
+    def closeEvent(self, event):
+        # Stop the scans first, so closing does not wait for a whole large file
+        for worker in self.count_workers:
+            worker.requestInterruption()
+        for worker in self.count_workers:
+            worker.wait()
+        for source in self.sources:
+            source.close()
+        super().closeEvent(event)
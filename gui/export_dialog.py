@@ -0,0 +1,116 @@
+# gui/export_dialog.py
+
+import os
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QPushButton,
+    QCheckBox, QComboBox, QListWidget, QListWidgetItem, QDialogButtonBox, QFileDialog
+)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+
+from plots.export import EXPORT_PRESETS, export_plot
+
+
+class ExportDialog(QDialog):
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Plot")
+        self.init_ui(directory)
+
+    def init_ui(self, directory):
+        self.layout = QVBoxLayout(self)
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Output File:"), 0, 0)
+        self.output_input = QLineEdit(os.path.join(directory, "plot.png"))
+        grid.addWidget(self.output_input, 0, 1)
+        self.browse_button = QPushButton("Browse...")
+        self.browse_button.clicked.connect(self.choose_output)
+        grid.addWidget(self.browse_button, 0, 2)
+
+        grid.addWidget(QLabel("Resolution:"), 1, 0)
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItems(["Decimated to output size", "Full resolution"])
+        grid.addWidget(self.resolution_combo, 1, 1, 1, 2)
+        self.layout.addLayout(grid)
+
+        self.rasterize_checkbox = QCheckBox("Rasterize dense series in vector output (SVG/PDF)")
+        self.rasterize_checkbox.setChecked(True)
+        self.layout.addWidget(self.rasterize_checkbox)
+
+        self.layout.addWidget(QLabel("Presets:"))
+        self.presets_list = QListWidget()
+        for preset in EXPORT_PRESETS:
+            size = "current size" if preset['size'] is None else f"{preset['size'][0]} x {preset['size'][1]} in"
+            item = QListWidgetItem(f"{preset['name']} ({preset['dpi']} dpi, {size})")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if preset['name'] == 'Screen' else Qt.Unchecked)
+            item.setData(Qt.UserRole, preset)
+            self.presets_list.addItem(item)
+        self.layout.addWidget(self.presets_list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(buttons)
+        self.layout.addLayout(button_layout)
+
+    def choose_output(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Plot", self.output_input.text(),
+            "PNG Files (*.png);;SVG Files (*.svg);;PDF Files (*.pdf);;All Files (*)"
+        )
+        if file_path:
+            self.output_input.setText(file_path)
+
+    def get_export_settings(self):
+        presets = [
+            self.presets_list.item(index).data(Qt.UserRole)
+            for index in range(self.presets_list.count())
+            if self.presets_list.item(index).checkState() == Qt.Checked
+        ]
+        return {
+            'output': self.output_input.text(),
+            'presets': presets,
+            'rasterize': self.rasterize_checkbox.isChecked(),
+            'full_resolution': self.resolution_combo.currentText() == "Full resolution",
+        }
+
+
+class ExportWorker(QThread):
+    """Waits for an export off the GUI thread.
+
+    The snapshot is drawn and saved by worker processes (see export_plot);
+    this thread only hands it over and reports progress, so the figure on
+    screen stays interactive and matplotlib's global state is never used
+    from two threads.
+    """
+
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(list)
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, snap, settings, parent=None):
+        super().__init__(parent)
+        self.snap = snap
+        self.settings = dict(settings)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            written = export_plot(
+                self.snap, self.settings['output'], self.settings['presets'],
+                rasterize=self.settings['rasterize'], full_resolution=self.settings['full_resolution'],
+                on_progress=self.progress.emit, is_cancelled=self.is_cancelled,
+            )
+        except Exception as e:
+            self.export_failed.emit(str(e))
+            return
+        self.export_finished.emit(written)
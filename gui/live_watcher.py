@@ -0,0 +1,126 @@
+# gui/live_watcher.py
+
+import os
+import time
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from plots.ingestion import get_columns
+from plots.live import TailReader
+from plots.normalization import is_active
+from plots.profiling import span
+
+# Most redraws per second while files are growing
+LIVE_FPS = float(os.environ.get('DATAVIZ_LIVE_FPS', 20))
+
+
+class LiveUpdater(QObject):
+    """Follows growing data files and appends their new rows to the plot.
+
+    Changes reported by a QFileSystemWatcher are coalesced and applied at
+    most ``fps`` times per second. For 2D line plots only the bytes appended
+    since the last read are parsed and the points are added to the existing
+    lines through their LevelOfDetail. Any other plot, or a file that shrank
+    or was replaced, emits ``reload_requested`` for a full update instead.
+    """
+
+    reload_requested = pyqtSignal()
+
+    def __init__(self, figure, fps=LIVE_FPS, parent=None):
+        super().__init__(parent)
+        self.figure = figure
+        self.interval = 1.0 / max(fps, 1)
+        self.readers = {}
+        self.dirty = set()
+        self.reloading = False
+        self.last_frame = 0.0
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.apply_updates)
+
+    def start(self):
+        # Follows the files of the last plot_data call
+        self.stop()
+        state = getattr(self.figure, 'plot_state', None)
+        if state is None or not state['data_files']:
+            return
+        x_col, y_col = get_columns(state['plot_details'])
+        # Normalized lines depend on the whole series; those files are reloaded
+        lines = {} if is_active(state.get('normalization')) else state.get('line_by_file', {})
+        for file_path, dataset in zip(state['data_files'], state['datasets']):
+            # Continue right after the last line the loader parsed; rows
+            # appended while it ran are read from there
+            offset = getattr(dataset, 'parsed_bytes', None)
+            if file_path in lines and offset is not None and TailReader.supports(file_path):
+                try:
+                    self.readers[file_path] = TailReader(file_path, x_col, y_col, offset=offset,
+                                                         skip_row=dataset.open_row)
+                except OSError as e:
+                    print(f"Error watching file {file_path}: {e}")
+        self.watcher.addPaths(state['data_files'])
+
+    def stop(self):
+        self.timer.stop()
+        files = self.watcher.files()
+        if files:
+            self.watcher.removePaths(files)
+        self.readers = {}
+        self.dirty = set()
+        self.reloading = False
+
+    def on_file_changed(self, file_path):
+        # Files replaced by a rename drop out of the watcher; follow the new one
+        if file_path not in self.watcher.files() and os.path.exists(file_path):
+            self.watcher.addPath(file_path)
+        self.dirty.add(file_path)
+        self.schedule()
+
+    def schedule(self):
+        if self.timer.isActive() or self.reloading:
+            return
+        delay = max(0.0, self.last_frame + self.interval - time.perf_counter())
+        self.timer.start(int(delay * 1000))
+
+    def apply_updates(self):
+        state = getattr(self.figure, 'plot_state', None)
+        if state is None or self.reloading:
+            return
+        dirty, self.dirty = self.dirty, set()
+        lod = getattr(state['ax'], 'level_of_detail', None)
+        lines = state.get('line_by_file', {})
+        appended = False
+
+        with span('live.append', files=len(dirty)):
+            for file_path in dirty:
+                reader = self.readers.get(file_path)
+                columns = reader.read() if reader is not None and lod is not None else None
+                if columns is None:
+                    # Not appendable: rebuild the whole plot once
+                    self.reloading = True
+                    self.reload_requested.emit()
+                    return
+                if reader.more:
+                    self.dirty.add(file_path)
+                if len(columns[0]):
+                    lod.extend(lines[file_path], *columns)
+                    appended = True
+                self.update_signature(state, file_path, reader.offset)
+
+            if appended:
+                lod.follow()
+                self.figure.canvas.draw_idle()
+        self.last_frame = time.perf_counter()
+        if self.dirty:
+            self.schedule()
+
+    def update_signature(self, state, file_path, offset):
+        # Keeps update_plot_in_place working on files that were followed to the end
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        if stat.st_size == offset:
+            index = state['data_files'].index(file_path)
+            state['file_signatures'][index] = (stat.st_mtime_ns, stat.st_size)
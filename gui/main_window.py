@@ -1,20 +1,35 @@
 # gui/main_window.py
 
 import os
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QGridLayout, QVBoxLayout, QHBoxLayout,
     QPushButton, QShortcut, QFileDialog, QListWidgetItem, QColorDialog,
-    QTableWidget, QTableWidgetItem, QHeaderView, QLabel, QTabWidget, QFrame
+    QTabWidget, QFrame, QProgressBar, QMessageBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QKeySequence, QIcon
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT as NavigationToolbar
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.text import Text
 
 from gui.tabs import GeneralTab, NormalizationTab
-from plots.plotting import plot_data
+from plots.plotting import plot_data, update_plot_in_place
+from gui.data_loader import DataLoadWorker
+from gui.data_view import DataStructureWindow
+from gui.canvas import TimedFigureCanvas as FigureCanvas, PerformanceOverlay
+from gui.annotation_preview import AnnotationPreview
+from gui.live_watcher import LiveUpdater
+from gui.export_dialog import ExportDialog, ExportWorker
+from plots.profiling import PhaseTimer, tracer
+from plots.annotations import AnnotationRegistry, SeriesIndex
+from plots.ingestion import get_columns, load_columns, shutdown_executor
+from plots.data_cache import dataset_cache
+from plots.export import snapshot, draw_snapshot
+from plots.lifecycle import figure_registry
+from plots.project import PROJECT_EXTENSION, read_project, save_project, load_project_datasets, seed_dataset_cache
+
+# Shortest interval between redraws of a plot whose files are still loading (ms)
+PARTIAL_RENDER_MS = 250
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -27,12 +42,26 @@ class MainWindow(QMainWindow):
         self.last_directory = os.path.expanduser("~")
 
         self.text_items = []
-        self.annotations = []
+        self.annotations = AnnotationRegistry()
+        self.series_index = SeriesIndex()
         self.plot_type = "2D"
         self.text_color = 'black'
         self.annotation_mode = None  # None, 'point', 'vline', 'hline'
-        self.temp_annotation = None
         self.selected_lines = []
+        self.load_worker = None
+        # Every load thread that has not finished yet, current or cancelled;
+        # a running QThread must never be garbage collected
+        self.load_workers = set()
+        # Files loaded so far by the current worker, drawn before the rest
+        # arrive; renders are coalesced so many small files redraw rarely
+        self.partial_datasets = None
+        self.partial_timer = QTimer(self)
+        self.partial_timer.setSingleShot(True)
+        self.partial_timer.setInterval(PARTIAL_RENDER_MS)
+        self.partial_timer.timeout.connect(self.render_partial)
+        self.export_worker = None
+        self.expanded_window = None
+        self.data_window = None
 
         # Initialize central widget and layout correctly
         self.central_widget = QWidget()
@@ -49,9 +78,13 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.general_tab, QIcon('gui/resources/general_icon.png'), "General")
         self.tabs.addTab(self.normalization_tab, QIcon('gui/resources/normalization_icon.png'), "Normalization")
 
-        # Plot area
-        self.figure = plt.figure()
+        # Plot area; the registry's plain Figures are not kept alive by pyplot
+        self.figure = figure_registry.new_figure('main')
         self.canvas = FigureCanvas(self.figure)
+        self.performance_overlay = PerformanceOverlay(self.canvas)
+        self.annotation_preview = AnnotationPreview(self.canvas)
+        self.live_updater = LiveUpdater(self.figure, parent=self)
+        self.live_updater.reload_requested.connect(self.update_plot)
         self.toolbar = NavigationToolbar(self.canvas, self)
 
         # Create a QFrame with rounded corners for the plot
@@ -74,6 +107,12 @@ class MainWindow(QMainWindow):
         # self.update_button.setIcon(QIcon('gui/resources/update_icon.png'))  # Icon removed
         self.update_button.clicked.connect(self.update_plot)
 
+        # Progress of the background file loading
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setAlignment(Qt.AlignCenter)
+        self.load_progress_bar.setFixedHeight(20)
+        self.load_progress_bar.hide()
+
         self.show_data_structure_button = QPushButton("Show Data Structure")
         # self.show_data_structure_button.setIcon(QIcon('gui/resources/data_structure_icon.png'))  # Icon removed
         self.show_data_structure_button.clicked.connect(self.show_data_structure)
@@ -94,10 +133,24 @@ class MainWindow(QMainWindow):
         self.expand_button.clicked.connect(self.expand_window)
 
         plot_layout.addWidget(self.update_button)
+        plot_layout.addWidget(self.load_progress_bar)
         plot_layout.addLayout(self.plot_buttons_layout)
         plot_layout.addWidget(self.show_data_structure_button)
         plot_layout.addWidget(self.expand_button)
 
+        self.project_buttons_layout = QHBoxLayout()
+        self.save_project_button = QPushButton("Save Project")
+        self.save_project_button.clicked.connect(self.save_project)
+        self.project_buttons_layout.addWidget(self.save_project_button)
+        self.open_project_button = QPushButton("Open Project")
+        self.open_project_button.clicked.connect(self.open_project)
+        self.project_buttons_layout.addWidget(self.open_project_button)
+        plot_layout.addLayout(self.project_buttons_layout)
+
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export_plot)
+        plot_layout.addWidget(self.export_button)
+
         plot_widget = QWidget()
         plot_widget.setLayout(plot_layout)
 
@@ -115,6 +168,22 @@ class MainWindow(QMainWindow):
         delete_shortcut = QShortcut(QKeySequence("Delete"), self)
         delete_shortcut.activated.connect(self.delete_selected_file)
 
+        # Performance overlay and trace export shortcuts
+        overlay_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        overlay_shortcut.activated.connect(self.performance_overlay.toggle)
+        trace_shortcut = QShortcut(QKeySequence("Ctrl+Shift+T"), self)
+        trace_shortcut.activated.connect(self.export_trace)
+        memory_shortcut = QShortcut(QKeySequence("Ctrl+Shift+M"), self)
+        memory_shortcut.activated.connect(self.show_memory_report)
+
+        # Project shortcuts
+        save_shortcut = QShortcut(QKeySequence("Ctrl+S"), self)
+        save_shortcut.activated.connect(self.save_project)
+        open_shortcut = QShortcut(QKeySequence("Ctrl+O"), self)
+        open_shortcut.activated.connect(self.open_project)
+        export_shortcut = QShortcut(QKeySequence("Ctrl+E"), self)
+        export_shortcut.activated.connect(self.export_plot)
+
         # Connect the canvas to the event handler
         self.canvas.mpl_connect('button_press_event', self.on_click)
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
@@ -141,22 +210,26 @@ class MainWindow(QMainWindow):
         self.custom_annotations_panel = general_tab.custom_annotations_panel
         self.plot_visuals_panel = general_tab.plot_visuals_panel
         self.plot_details_panel = general_tab.plot_details_panel
+        self.normalization_panel = self.normalization_tab.normalization_panel
 
         # Connect signals and slots
         self.selected_data_panel.file_selector_button.clicked.connect(self.choose_files)
         self.selected_data_panel.add_file_button.clicked.connect(self.add_files)
         self.selected_data_panel.select_all_button.clicked.connect(self.toggle_select_all_files)
+        self.selected_data_panel.live_update_checkbox.toggled.connect(self.set_live_update)
         self.additional_text_panel.text_color_button.clicked.connect(self.choose_text_color)
         self.additional_text_panel.add_text_button.clicked.connect(self.add_text_to_plot)
         self.additional_text_panel.delete_text_button.clicked.connect(self.delete_text_from_plot)
         self.custom_annotations_panel.apply_changes_button.clicked.connect(self.apply_changes)
         self.custom_annotations_panel.calculate_distance_button.clicked.connect(self.start_distance_calculation)
+        self.custom_annotations_panel.annotation_type_combo.currentTextChanged.connect(self.set_annotation_mode)
+        self.normalization_panel.reference_file_button.clicked.connect(self.choose_reference_file)
 
     # Include all other methods (choose_files, add_files, update_plot, etc.)
     # Ensure all methods are properly implemented as in the previous code
 
     def choose_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Files", self.last_directory, "CSV Files (*.csv);;All Files (*)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Select Files", self.last_directory, "CSV Files (*.csv);;NumPy/Binary Files (*.npy *.bin *.raw *.dat);;All Files (*)")
         if files:
             self.last_directory = os.path.dirname(files[0])  # Update the last directory
             self.selected_data_panel.selected_files_list.clear()
@@ -169,7 +242,7 @@ class MainWindow(QMainWindow):
                 self.selected_data_panel.selected_files_list.addItem(item)
 
     def add_files(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Select Files", self.last_directory, "CSV Files (*.csv);;All Files (*)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Select Files", self.last_directory, "CSV Files (*.csv);;NumPy/Binary Files (*.npy *.bin *.raw *.dat);;All Files (*)")
         if files:
             self.last_directory = os.path.dirname(files[0])  # Update the last directory
             for file in files:
@@ -180,6 +253,11 @@ class MainWindow(QMainWindow):
                 item.setData(Qt.UserRole, file)  # Store the full file path in the item
                 self.selected_data_panel.selected_files_list.addItem(item)
 
+    def choose_reference_file(self):
+        file, _ = QFileDialog.getOpenFileName(self, "Select Reference File", self.last_directory, "CSV Files (*.csv);;NumPy/Binary Files (*.npy *.bin *.raw *.dat);;All Files (*)")
+        if file:
+            self.normalization_panel.set_reference_file(file)
+
     def toggle_select_all_files(self):
         select_all = self.selected_data_panel.select_all_button.text() == "Select All"
         for index in range(self.selected_data_panel.selected_files_list.count()):
@@ -221,22 +299,309 @@ class MainWindow(QMainWindow):
             self.canvas.draw_idle()
 
     def update_plot(self):
+        timer = PhaseTimer('update_plot')
         # Gather all parameters from panels
         data_files = self.selected_data_panel.get_selected_files()
         plot_details = self.plot_details_panel.get_plot_details()
         axis_details = self.axis_details_panel.get_axis_details()
         plot_visuals = self.plot_visuals_panel.get_plot_visuals()
+        normalization = self.normalization_panel.get_normalization_settings()
+
+        # Cancel a load that is still running for a previous update
+        self.cancel_loading()
+        timer.mark('collect')
+
+        # Column numbers are checked before any file is read
+        try:
+            get_columns(plot_details)
+        except ValueError:
+            print("Invalid X or Y column number")
+            self.load_progress_bar.hide()
+            return
+
+        # Cosmetic edits only touch the artists that are already drawn
+        if update_plot_in_place(self.figure, data_files, plot_details, axis_details, plot_visuals, is_3d=(self.plot_type == "3D"), normalization=normalization):
+            self.load_progress_bar.hide()
+            return
+        self.load_started = timer.last
+
+        # Parse the files on a worker thread; each is drawn as it arrives and
+        # the plot is rendered once more when they are all in
+        self.pending_plot = (data_files, plot_details, axis_details, plot_visuals, self.plot_type == "3D", normalization)
+        self.partial_datasets = [None] * len(data_files)
+        self.load_worker = DataLoadWorker(data_files, plot_details, histogram=(plot_visuals['plot_type'] == "Histogram"), parent=self)
+        self.load_worker.progress.connect(self.on_load_progress)
+        self.load_worker.file_loaded.connect(self.on_file_loaded)
+        self.load_worker.file_failed.connect(self.on_file_failed)
+        self.load_worker.loading_finished.connect(self.on_loading_finished)
+        self.load_worker.finished.connect(self.release_load_worker)
+        self.load_workers.add(self.load_worker)
+        self.load_progress_bar.setRange(0, max(len(data_files), 1))
+        self.load_progress_bar.setValue(0)
+        self.load_progress_bar.show()
+        self.load_worker.start()
+
+    def cancel_loading(self):
+        if self.load_worker is None:
+            return
+        worker = self.load_worker
+        self.load_worker = None
+        worker.cancel()
+        self.partial_timer.stop()
+        self.partial_datasets = None
+        worker.progress.disconnect(self.on_load_progress)
+        worker.file_loaded.disconnect(self.on_file_loaded)
+        worker.file_failed.disconnect(self.on_file_failed)
+        worker.loading_finished.disconnect(self.on_loading_finished)
+
+    def release_load_worker(self):
+        # The thread has exited; Qt deletes it once control returns to the event loop
+        worker = self.sender()
+        self.load_workers.discard(worker)
+        worker.deleteLater()
+
+    def wait_for_load_workers(self):
+        for worker in list(self.load_workers):
+            worker.cancel()
+            worker.wait()
+        self.load_workers.clear()
+
+    def on_file_loaded(self, index, file_path, dataset):
+        self.partial_datasets[index] = dataset
+        if not self.partial_timer.isActive():
+            self.partial_timer.start()
+
+    def render_partial(self):
+        if self.load_worker is None or self.partial_datasets is None:
+            return
+        data_files, plot_details, axis_details, plot_visuals, is_3d, normalization = self.pending_plot
+        self.render_plot(data_files, plot_details, axis_details, plot_visuals, is_3d,
+                         list(self.partial_datasets), normalization, partial=True)
+
+    def on_file_failed(self, index, file_path, error):
+        self.statusBar().showMessage(f"Error loading {os.path.basename(file_path)}: {error}", 5000)
+
+    def on_load_progress(self, done, total):
+        self.load_progress_bar.setRange(0, max(total, 1))
+        self.load_progress_bar.setValue(done)
+        self.load_progress_bar.setFormat(f"Loading files: {done}/{total}")
+
+    def on_loading_finished(self, datasets):
+        tracer.record('update_plot.load', self.load_started, time.perf_counter(), files=len(datasets))
+        self.load_worker = None
+        self.partial_timer.stop()
+        self.partial_datasets = None
+        self.load_progress_bar.hide()
+        data_files, plot_details, axis_details, plot_visuals, is_3d, normalization = self.pending_plot
+        self.render_plot(data_files, plot_details, axis_details, plot_visuals, is_3d, datasets, normalization)
+
+    def render_plot(self, data_files, plot_details, axis_details, plot_visuals, is_3d, datasets=None, normalization=None,
+                    partial=False):
+        timer = PhaseTimer('update_plot')
         # Call the plot_data function
-        plot_data(self.figure, data_files, plot_details, axis_details, plot_visuals, is_3d=(self.plot_type == "3D"))
+        plot_data(self.figure, data_files, plot_details, axis_details, plot_visuals, is_3d=is_3d, datasets=datasets, normalization=normalization)
+        timer.mark('render')
+        if partial and hasattr(self.figure, 'plot_state'):
+            self.figure.plot_state['partial'] = True
 
-        # Re-add all existing text items
+        # Re-add all existing text items as new artists; the old ones still
+        # point at the cleared axes and would keep it and its data alive
         ax = self.figure.gca()
-        if self.plot_type == "2D":
+        self.text_items = [
+            Text(*text_item.get_position(), text_item.get_text(), fontsize=text_item.get_fontsize(),
+                 color=text_item.get_color(), ha='left')
+            for text_item in self.text_items
+        ]
+        if not is_3d:
             for text_item in self.text_items:
                 ax.add_artist(text_item)
 
+        # The annotations were cleared with the figure; draw them again
+        self.annotations.forget_artists()
+        self.selected_lines.clear()
+        if not is_3d:
+            self.annotations.restore(ax)
+
+        # Index the plotted series for snapping annotation points
+        self.series_index.clear()
+        for x, y in getattr(self.figure, 'plot_state', {}).get('series', []):
+            self.series_index.add(x, y)
+
+        # Follow the newly plotted files from where they were read, once
+        # every file is in
+        if not partial and self.selected_data_panel.get_live_update():
+            self.live_updater.start()
+
         self.canvas.draw_idle()
 
+    def set_live_update(self, enabled):
+        if enabled:
+            self.live_updater.start()
+        else:
+            self.live_updater.stop()
+
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Trace", os.path.join(self.last_directory, "trace.json"), "Trace Files (*.json)")
+        if file_path:
+            try:
+                tracer.export_chrome_trace(file_path)
+            except OSError as e:
+                print(f"Error exporting trace: {e}")
+
+    def export_plot(self):
+        if self.export_worker is not None and self.export_worker.isRunning():
+            self.statusBar().showMessage("An export is already running")
+            return
+        snap = snapshot(self.figure, self.annotations, self.text_items)
+        if snap is None:
+            return
+        dialog = ExportDialog(self.last_directory, self)
+        if dialog.exec_() != ExportDialog.Accepted:
+            return
+        settings = dialog.get_export_settings()
+        if not settings['output'] or not settings['presets']:
+            return
+
+        # Render on a worker from the snapshot; the canvas stays usable
+        self.export_worker = ExportWorker(snap, settings)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.export_finished.connect(self.on_export_finished)
+        self.export_worker.export_failed.connect(self.on_export_failed)
+        self.statusBar().showMessage("Exporting...")
+        self.export_worker.start()
+
+    def on_export_progress(self, done, total):
+        self.statusBar().showMessage(f"Exporting: {done}/{total}")
+
+    def on_export_finished(self, written):
+        self.statusBar().showMessage(f"Exported {len(written)} file(s)", 5000)
+        if written:
+            self.last_directory = os.path.dirname(written[0]) or self.last_directory
+
+    def on_export_failed(self, message):
+        print(f"Error exporting plot: {message}")
+        self.statusBar().showMessage("Export failed", 5000)
+
+    def show_memory_report(self):
+        report = figure_registry.format_report()
+        QMessageBox.information(self, "Memory Report", report)
+
+    def closeEvent(self, event):
+        # Stop everything that still refers to the figures, then free them
+        self.live_updater.stop()
+        self.cancel_loading()
+        self.wait_for_load_workers()
+        shutdown_executor()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+            self.export_worker = None
+        if self.expanded_window is not None:
+            self.expanded_window.close()
+        if self.data_window is not None:
+            self.data_window.close()
+            self.data_window = None
+        self.annotations.forget_artists()
+        self.selected_lines.clear()
+        self.series_index.clear()
+        self.text_items = []
+        figure_registry.release_all()
+        dataset_cache.clear()
+        super().closeEvent(event)
+
+    def session_state(self):
+        # Everything needed to rebuild the window, as plain JSON values
+        return {
+            'files': self.selected_data_panel.get_files_state(),
+            'plot_type': self.plot_type,
+            'last_directory': self.last_directory,
+            'plot_details': self.plot_details_panel.get_plot_details(),
+            'axis_details': self.axis_details_panel.get_axis_details(),
+            'plot_visuals': self.plot_visuals_panel.get_plot_visuals(),
+            'normalization': self.normalization_panel.get_normalization_settings(),
+            'snap_to_data': self.custom_annotations_panel.get_snap_to_data(),
+            'annotations': [annotation.to_dict() for annotation in self.annotations],
+            'text_items': [
+                {
+                    'text': item.get_text(),
+                    'x': float(item.get_position()[0]),
+                    'y': float(item.get_position()[1]),
+                    'size': item.get_fontsize(),
+                    'color': item.get_color(),
+                }
+                for item in self.text_items
+            ],
+        }
+
+    def save_project(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Project", self.last_directory, f"Data Viz Pro Projects (*{PROJECT_EXTENSION})")
+        if not file_path:
+            return
+        if not file_path.endswith(PROJECT_EXTENSION):
+            file_path += PROJECT_EXTENSION
+
+        # Store binary copies of the plotted columns (usually already cached)
+        datasets = {}
+        columns = None
+        try:
+            columns = get_columns(self.plot_details_panel.get_plot_details())
+        except ValueError:
+            pass  # No columns chosen yet; only the settings are saved
+        if columns is not None:
+            for data_file in self.selected_data_panel.get_selected_files():
+                try:
+                    datasets[data_file] = load_columns(data_file, *columns)
+                except Exception as e:
+                    print(f"Error loading file {data_file}: {e}")
+        try:
+            save_project(file_path, self.session_state(), datasets, columns or (0, 0))
+        except (OSError, ValueError) as e:
+            print(f"Error saving project: {e}")
+
+    def open_project(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Project", self.last_directory, f"Data Viz Pro Projects (*{PROJECT_EXTENSION})")
+        if not file_path:
+            return
+        try:
+            document = read_project(file_path)
+        except (OSError, ValueError) as e:
+            print(f"Error opening project: {e}")
+            return
+
+        self.cancel_loading()
+        self.selected_data_panel.set_files_state(document.get('files', []))
+        self.plot_details_panel.set_plot_details(document.get('plot_details', {}))
+        self.axis_details_panel.set_axis_details(document.get('axis_details', {}))
+        self.plot_visuals_panel.set_plot_visuals(document.get('plot_visuals', {}))
+        self.normalization_panel.set_normalization_settings(document.get('normalization', {}))
+        self.custom_annotations_panel.set_snap_to_data(document.get('snap_to_data', False))
+        self.plot_type = document.get('plot_type', "2D")
+        self.last_directory = document.get('last_directory', self.last_directory)
+        self.annotations.load(document.get('annotations', []))
+        self.selected_lines.clear()
+        # New, unattached text artists; render_plot adds them to the axes
+        self.text_items = [
+            Text(item['x'], item['y'], item['text'], fontsize=item['size'], color=item['color'], ha='left')
+            for item in document.get('text_items', [])
+        ]
+
+        # Draw straight from the stored copies when every file has one;
+        # otherwise they only spare the unchanged files from being parsed
+        data_files = self.selected_data_panel.get_selected_files()
+        try:
+            columns = get_columns(self.plot_details_panel.get_plot_details())
+        except ValueError:
+            return
+        datasets = load_project_datasets(file_path, document, columns)
+        seed_dataset_cache(datasets, columns)
+        if data_files and all(data_file in datasets for data_file in data_files):
+            self.render_plot(data_files, self.plot_details_panel.get_plot_details(), self.axis_details_panel.get_axis_details(),
+                             self.plot_visuals_panel.get_plot_visuals(), self.plot_type == "3D",
+                             [datasets[data_file] for data_file in data_files],
+                             self.normalization_panel.get_normalization_settings())
+        elif data_files:
+            self.update_plot()
+
     def plot_2d(self):
         self.plot_type = "2D"
         self.update_plot()
@@ -246,53 +611,39 @@ class MainWindow(QMainWindow):
         self.update_plot()
 
     def show_data_structure(self):
-        # Get the selected file names
-        selected_items = [
-            item for item in self.selected_data_panel.selected_files_list.findItems("*", Qt.MatchWildcard)
-            if item.checkState() == Qt.Checked
-        ]
+        # Get the selected file paths
+        selected_files = self.selected_data_panel.get_selected_files()
 
-        if not selected_items:
+        if not selected_files:
             return
 
-        # Create a new window to show the data structure
-        self.data_window = QWidget()
-        self.data_window.setWindowTitle("Data Structure")
-        self.data_layout = QVBoxLayout(self.data_window)
+        # Only one preview at a time; closing the previous one stops its row
+        # scans before the window is dropped
+        if self.data_window is not None:
+            self.data_window.close()
 
-        for item in selected_items:
-            file_path = item.data(Qt.UserRole)
-            try:
-                df = pd.read_csv(file_path)
-                df_head = df.head()
-
-                table = QTableWidget()
-                table.setRowCount(len(df_head))
-                table.setColumnCount(len(df_head.columns))
-                table.setHorizontalHeaderLabels([str(col) for col in df_head.columns])
-                table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-                for i in range(len(df_head)):
-                    for j in range(len(df_head.columns)):
-                        table.setItem(i, j, QTableWidgetItem(str(df_head.iloc[i, j])))
-
-                self.data_layout.addWidget(QLabel(item.text()))
-                self.data_layout.addWidget(table)
-            except Exception as e:
-                print(f"Error loading file {file_path}: {e}")
-
-        self.data_window.setLayout(self.data_layout)
-        self.data_window.setGeometry(100, 100, 800, 600)
+        # Create a new window to preview the data, read lazily as it scrolls
+        self.data_window = DataStructureWindow(selected_files)
         self.data_window.show()
 
     def expand_window(self):
+        # Nothing to mirror before the first plot
+        snap = snapshot(self.figure, self.annotations, self.text_items)
+        if snap is None:
+            return
+        # Only one expanded view at a time; the previous one releases its figure
+        if self.expanded_window is not None:
+            self.expanded_window.close()
+
         # Create a new window for the expanded plot
         self.expanded_window = QWidget()
+        self.expanded_window.setAttribute(Qt.WA_DeleteOnClose)
         self.expanded_window.setWindowTitle("Expanded Plot")
         self.expanded_layout = QVBoxLayout(self.expanded_window)
 
-        # Matplotlib Figure and Canvas for expanded window
-        self.expanded_figure = plt.figure()
+        # Matplotlib Figure and Canvas for expanded window; a plain Figure is
+        # not registered with pyplot, so it is freed with the window
+        self.expanded_figure = figure_registry.new_figure('expanded')
         self.expanded_canvas = FigureCanvas(self.expanded_figure)
         self.expanded_toolbar = NavigationToolbar(self.expanded_canvas, self.expanded_window)
 
@@ -305,16 +656,22 @@ class MainWindow(QMainWindow):
 
         self.expanded_window.closeEvent = self.close_expanded_window
 
-        # Copy current plot to the expanded plot
-        data_files = self.selected_data_panel.get_selected_files()
-        plot_details = self.plot_details_panel.get_plot_details()
-        axis_details = self.axis_details_panel.get_axis_details()
-        plot_visuals = self.plot_visuals_panel.get_plot_visuals()
-
-        plot_data(self.expanded_figure, data_files, plot_details, axis_details, plot_visuals, is_3d=(self.plot_type == "3D"))
+        # Redraw the current plot from the arrays already loaded (with text
+        # items, annotations and the current view) instead of reading the files again
+        try:
+            draw_snapshot(self.expanded_figure, snap)
+        except Exception as e:
+            print(f"Error drawing expanded plot: {e}")
+        self.expanded_canvas.draw_idle()
 
     def close_expanded_window(self, event):
+        # Drop the artists and every reference to the figure so it can be collected
+        figure_registry.release(self.expanded_figure)
         self.expanded_window = None
+        self.expanded_figure = None
+        self.expanded_canvas = None
+        self.expanded_toolbar = None
+        event.accept()
 
     # Annotation functions
     def on_click(self, event):
@@ -331,67 +688,60 @@ class MainWindow(QMainWindow):
         elif annotation_type == "None":
             self.select_line(event)
 
+    def set_annotation_mode(self, annotation_type):
+        self.annotation_mode = {
+            "Annotation Point": 'point',
+            "Vertical Line": 'vline',
+            "Horizontal Line": 'hline',
+        }.get(annotation_type)
+        self.annotation_preview.set_mode(self.annotation_mode)
+
     def on_mouse_move(self, event):
         if self.plot_type != "2D" or not self.annotation_mode:
             return
 
-        if self.temp_annotation:
-            self.temp_annotation.remove()
-            self.temp_annotation = None
-
-        if self.annotation_mode == 'vline':
-            self.temp_annotation = self.figure.gca().axvline(x=event.xdata, color='r', linestyle='--')
-        elif self.annotation_mode == 'hline':
-            self.temp_annotation = self.figure.gca().axhline(y=event.ydata, color='b', linestyle='--')
-
-        self.canvas.draw_idle()
+        # Blit the preview over the cached background instead of redrawing
+        self.annotation_preview.update(event)
 
     def add_annotation_point(self, event):
         if event.xdata is None or event.ydata is None:
             return
-        star, = self.figure.gca().plot(event.xdata, event.ydata, marker='*', color='black', markersize=10)
-        text = self.figure.gca().text(event.xdata, event.ydata, f'({event.xdata:.2f}, {event.ydata:.2f})', fontsize=10, color='black', ha='left')
-        self.annotations.append((star, text))
+        x, y = event.xdata, event.ydata
+        if self.custom_annotations_panel.get_snap_to_data():
+            snapped = self.series_index.snap(event.inaxes or self.figure.gca(), event.x, event.y)
+            if snapped is not None:
+                x, y = snapped
+        self.annotations.add(self.figure.gca(), 'point', x=x, y=y)
         self.canvas.draw_idle()
 
     def add_vertical_line(self, event):
         if event.xdata is None:
             return
-        line = self.figure.gca().axvline(x=event.xdata, color='r', linestyle='--')
-        self.annotations.append(line)
+        self.annotations.add(self.figure.gca(), 'vline', x=event.xdata)
         self.canvas.draw_idle()
 
     def add_horizontal_line(self, event):
         if event.ydata is None:
             return
-        line = self.figure.gca().axhline(y=event.ydata, color='b', linestyle='--')
-        self.annotations.append(line)
+        self.annotations.add(self.figure.gca(), 'hline', y=event.ydata)
         self.canvas.draw_idle()
 
     def apply_changes(self):
         self.annotation_mode = None
-        self.temp_annotation = None
+        self.annotation_preview.set_mode(None)
         self.custom_annotations_panel.annotation_type_combo.setCurrentText("None")
         self.canvas.draw_idle()
 
     def select_line(self, event):
-        if event.xdata is None or event.ydata is None:
+        if event.xdata is None or event.ydata is None or event.inaxes is None:
             return
 
-        for ann in self.annotations:
-            if isinstance(ann, plt.Line2D):
-                # Check if it's a vertical line
-                if np.allclose(ann.get_xdata(), [ann.get_xdata()[0]]) and event.inaxes == ann.axes and ann.contains(event)[0]:
-                    self.selected_lines.append(ann)
-                    if len(self.selected_lines) == 2:
-                        self.calculate_distance()
-                    break
-                # Check if it's a horizontal line
-                elif np.allclose(ann.get_ydata(), [ann.get_ydata()[0]]) and event.inaxes == ann.axes and ann.contains(event)[0]:
-                    self.selected_lines.append(ann)
-                    if len(self.selected_lines) == 2:
-                        self.calculate_distance()
-                    break
+        # Bisect the sorted line positions instead of testing every annotation
+        ann = self.annotations.hit_test(event.inaxes, event.x, event.y)
+        if ann is not None:
+            self.selected_lines.append(ann)
+            if len(self.selected_lines) == 2:
+                self.calculate_distance()
 
     def start_distance_calculation(self):
         self.selected_lines.clear()
@@ -404,29 +754,12 @@ class MainWindow(QMainWindow):
         line1, line2 = self.selected_lines
         ax = self.figure.gca()
 
-        if np.allclose(line1.get_xdata(), [line1.get_xdata()[0]]) and np.allclose(line2.get_xdata(), [line2.get_xdata()[0]]):  # Both lines are vertical
-            x1 = line1.get_xdata()[0]
-            x2 = line2.get_xdata()[0]
-            dist = abs(x2 - x1)
-
+        if line1.kind == 'vline' and line2.kind == 'vline':  # Both lines are vertical
             # Draw a horizontal arrow between the lines
-            arrow = ax.annotate(f'd = {dist:.2f}', xy=((x1 + x2) / 2, ax.get_ylim()[1] - (ax.get_ylim()[1] - ax.get_ylim()[0]) * 0.05),
-                                xytext=((x1 + x2) / 2, ax.get_ylim()[1] - (ax.get_ylim()[1] - ax.get_ylim()[0]) * 0.05),
-                                arrowprops=dict(facecolor='black', arrowstyle='<->', lw=1.5),
-                                ha='center', va='center')
-            self.annotations.append(arrow)
-
-        elif np.allclose(line1.get_ydata(), [line1.get_ydata()[0]]) and np.allclose(line2.get_ydata(), [line2.get_ydata()[0]]):  # Both lines are horizontal
-            y1 = line1.get_ydata()[0]
-            y2 = line2.get_ydata()[0]
-            dist = abs(y2 - y1)
-
+            self.annotations.add(ax, 'distance', x=(line1.x, line2.x))
+        elif line1.kind == 'hline' and line2.kind == 'hline':  # Both lines are horizontal
             # Draw a vertical arrow between the lines
-            arrow = ax.annotate(f'd = {dist:.2f}', xy=(ax.get_xlim()[0] + (ax.get_xlim()[1] - ax.get_xlim()[0]) * 0.05, (y1 + y2) / 2),
-                                xytext=(ax.get_xlim()[0] + (ax.get_xlim()[1] - ax.get_xlim()[0]) * 0.05, (y1 + y2) / 2),
-                                arrowprops=dict(facecolor='black', arrowstyle='<->', lw=1.5),
-                                ha='center', va='center', rotation=90)
-            self.annotations.append(arrow)
+            self.annotations.add(ax, 'distance', y=(line1.y, line2.y))
 
         self.selected_lines.clear()
         self.canvas.draw_idle()
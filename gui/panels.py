@@ -54,6 +54,8 @@ class SelectedDataPanel(QGroupBox):
         self.add_file_button = QPushButton("Add Files")
         self.select_all_button = QPushButton("Select All")
         self.selected_files_list = DraggableListWidget()
+        # Follow the plotted files as rows are appended to them
+        self.live_update_checkbox = QCheckBox("Live Update")
 
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -63,6 +65,7 @@ class SelectedDataPanel(QGroupBox):
         self.layout.addWidget(self.add_file_button)
         self.layout.addWidget(self.select_all_button)
         self.layout.addWidget(self.scroll_area)
+        self.layout.addWidget(self.live_update_checkbox)
         self.setLayout(self.layout)
 
     def get_selected_files(self):
@@ -72,6 +75,26 @@ class SelectedDataPanel(QGroupBox):
         ]
         return [item.data(Qt.UserRole) for item in selected_items]
 
+    def get_live_update(self):
+        return self.live_update_checkbox.isChecked()
+
+    def get_files_state(self):
+        # Every listed file with its check state, in list order
+        files = []
+        for index in range(self.selected_files_list.count()):
+            item = self.selected_files_list.item(index)
+            files.append({'path': item.data(Qt.UserRole), 'checked': item.checkState() == Qt.Checked})
+        return files
+
+    def set_files_state(self, files):
+        self.selected_files_list.clear()
+        for file in files:
+            item = QListWidgetItem(os.path.basename(file['path']))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if file.get('checked') else Qt.Unchecked)
+            item.setData(Qt.UserRole, file['path'])
+            self.selected_files_list.addItem(item)
+
 class AxisDetailsPanel(QGroupBox):
     def __init__(self, parent=None):
         super().__init__("Axis Details", parent)
@@ -138,6 +161,18 @@ class AxisDetailsPanel(QGroupBox):
             'legend_font_size': self.legend_font_size_input.value(),
         }
 
+    def set_axis_details(self, details):
+        self.title_name_input.setText(details.get('title', ''))
+        self.x_axis_input.setText(details.get('x_label', ''))
+        self.y_axis_input.setText(details.get('y_label', ''))
+        self.x_min_input.setText(details.get('x_min', ''))
+        self.x_max_input.setText(details.get('x_max', ''))
+        self.y_min_input.setText(details.get('y_min', ''))
+        self.y_max_input.setText(details.get('y_max', ''))
+        self.axis_font_size_input.setValue(details.get('axis_font_size', self.axis_font_size_input.value()))
+        self.title_font_size_input.setValue(details.get('title_font_size', self.title_font_size_input.value()))
+        self.legend_font_size_input.setValue(details.get('legend_font_size', self.legend_font_size_input.value()))
+
 class AdditionalTextPanel(QGroupBox):
     def __init__(self, parent=None):
         super().__init__("Additional Text", parent)
@@ -210,11 +245,20 @@ class CustomAnnotationsPanel(QGroupBox):
         self.calculate_distance_button = QPushButton("Calculate Distance")
         self.layout.addWidget(self.calculate_distance_button)
 
+        self.snap_to_data_checkbox = QCheckBox("Snap Points to Data")
+        self.layout.addWidget(self.snap_to_data_checkbox)
+
         self.setLayout(self.layout)
 
     def get_annotation_type(self):
         return self.annotation_type_combo.currentText()
 
+    def get_snap_to_data(self):
+        return self.snap_to_data_checkbox.isChecked()
+
+    def set_snap_to_data(self, enabled):
+        self.snap_to_data_checkbox.setChecked(enabled)
+
 class PlotVisualsPanel(QGroupBox):
     def __init__(self, parent=None):
         super().__init__("Plot Visuals", parent)
@@ -256,6 +300,13 @@ class PlotVisualsPanel(QGroupBox):
             'apply_legends': self.apply_legends_checkbox.isChecked(),
         }
 
+    def set_plot_visuals(self, visuals):
+        self.plot_type_combo.setCurrentText(visuals.get('plot_type', self.plot_type_combo.currentText()))
+        self.add_grid_checkbox.setChecked(visuals.get('add_grid', False))
+        self.add_sub_grid_checkbox.setChecked(visuals.get('add_sub_grid', False))
+        self.plot_style_combo.setCurrentText(visuals.get('plot_style', self.plot_style_combo.currentText()))
+        self.apply_legends_checkbox.setChecked(visuals.get('apply_legends', False))
+
 class PlotDetailsPanel(QGroupBox):
     def __init__(self, parent=None):
         super().__init__("Plot Details", parent)
@@ -303,3 +354,65 @@ class PlotDetailsPanel(QGroupBox):
             'line_thickness': self.line_thickness_combo.currentText(),
             'scale_type': self.scale_type_combo.currentText(),
         }
+
+    def set_plot_details(self, details):
+        self.x_axis_col_input.setText(details.get('x_axis_col', ''))
+        self.y_axis_col_input.setText(details.get('y_axis_col', ''))
+        self.line_style_combo.setCurrentText(details.get('line_style', self.line_style_combo.currentText()))
+        self.point_style_combo.setCurrentText(details.get('point_style', self.point_style_combo.currentText()))
+        self.line_thickness_combo.setCurrentText(details.get('line_thickness', self.line_thickness_combo.currentText()))
+        self.scale_type_combo.setCurrentText(details.get('scale_type', self.scale_type_combo.currentText()))
+
+class NormalizationPanel(QGroupBox):
+    def __init__(self, parent=None):
+        super().__init__("Normalization", parent)
+        self.init_ui()
+
+    def init_ui(self):
+        self.layout = QGridLayout()
+
+        self.layout.addWidget(QLabel("Method:"), 0, 0)
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(["None", "Min-Max", "Z-Score", "Area", "Peak", "Baseline", "Reference"])
+        self.layout.addWidget(self.method_combo, 0, 1, 1, 2)
+
+        self.layout.addWidget(QLabel("Baseline X Range (min, max):"), 1, 0)
+        self.baseline_min_input = QLineEdit()
+        self.baseline_max_input = QLineEdit()
+        self.layout.addWidget(self.baseline_min_input, 1, 1)
+        self.layout.addWidget(self.baseline_max_input, 1, 2)
+
+        self.layout.addWidget(QLabel("Reference File:"), 2, 0)
+        self.reference_file_input = QLineEdit()
+        self.reference_file_input.setReadOnly(True)
+        self.layout.addWidget(self.reference_file_input, 2, 1)
+        self.reference_file_button = QPushButton("Choose...")
+        self.layout.addWidget(self.reference_file_button, 2, 2)
+
+        self.method_combo.currentTextChanged.connect(self.update_enabled_inputs)
+        self.update_enabled_inputs(self.method_combo.currentText())
+
+        self.setLayout(self.layout)
+
+    def update_enabled_inputs(self, method):
+        self.baseline_min_input.setEnabled(method == "Baseline")
+        self.baseline_max_input.setEnabled(method == "Baseline")
+        self.reference_file_input.setEnabled(method == "Reference")
+        self.reference_file_button.setEnabled(method == "Reference")
+
+    def set_reference_file(self, file_path):
+        self.reference_file_input.setText(file_path)
+
+    def get_normalization_settings(self):
+        return {
+            'method': self.method_combo.currentText(),
+            'baseline_min': self.baseline_min_input.text(),
+            'baseline_max': self.baseline_max_input.text(),
+            'reference_file': self.reference_file_input.text(),
+        }
+
+    def set_normalization_settings(self, settings):
+        self.method_combo.setCurrentText(settings.get('method', 'None'))
+        self.baseline_min_input.setText(settings.get('baseline_min', ''))
+        self.baseline_max_input.setText(settings.get('baseline_max', ''))
+        self.reference_file_input.setText(settings.get('reference_file', ''))
@@ -1,7 +1,7 @@
 # gui/splash_screen.py
 
 import os
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QProgressBar
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QProgressBar
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QFont
 
@@ -75,8 +75,19 @@ class SplashScreen(QWidget):
         self.progress_bar.setFixedHeight(20)
         self.overlay_layout.addWidget(self.progress_bar)
 
-    def update_progress(self, value):
+        # Current initialization step
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 10))
+        self.status_label.setStyleSheet("color: white;")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.overlay_layout.addWidget(self.status_label)
+
+    def update_progress(self, value, message=None):
         self.progress_bar.setValue(value)
+        if message is not None:
+            self.status_label.setText(message)
+        # Initialization runs on the GUI thread, so repaint before the next step
+        QApplication.processEvents()
 
     def get_resource_path(self, filename):
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -3,7 +3,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QLabel
 from gui.panels import (
     SelectedDataPanel, AxisDetailsPanel, AdditionalTextPanel,
-    CustomAnnotationsPanel, PlotVisualsPanel, PlotDetailsPanel
+    CustomAnnotationsPanel, PlotVisualsPanel, PlotDetailsPanel,
+    NormalizationPanel
 )
 from PyQt5.QtCore import Qt
 
@@ -48,7 +49,18 @@ class NormalizationTab(QWidget):
         self.layout.setSpacing(10)
         self.setLayout(self.layout)
 
-        # Placeholder content for the Normalization tab
-        placeholder_label = QLabel("Normalization functionality will be implemented here.")
-        placeholder_label.setAlignment(Qt.AlignCenter)
-        self.layout.addWidget(placeholder_label)
+        self.normalization_panel = NormalizationPanel()
+        self.layout.addWidget(self.normalization_panel)
+
+        # Short description of the methods
+        help_label = QLabel(
+            "Min-Max scales each series to [0, 1], Z-Score to zero mean and unit variance.\n"
+            "Area divides by the integral over X, Peak by the largest absolute value.\n"
+            "Baseline subtracts the mean over the X range (default: first 5% of points).\n"
+            "Reference divides by the reference file, interpolated onto each series' X.\n"
+            "Applied on the next plot update."
+        )
+        help_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        help_label.setWordWrap(True)
+        self.layout.addWidget(help_label)
+        self.layout.addStretch()
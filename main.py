@@ -2,14 +2,10 @@
 
 import sys
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
 
-from gui.main_window import MainWindow
 from gui.splash_screen import SplashScreen
 
-def main():
-    app = QApplication(sys.argv)
-
+def load_stylesheet(app):
     # Load and apply the stylesheet
     try:
         with open('style.qss', 'r') as f:
@@ -18,35 +14,33 @@ def main():
     except Exception as e:
         print(f"Error loading stylesheet: {e}")
 
+def initialize(app, splash):
+    # Each splash step reports real work; pandas is only imported once a
+    # file is actually loaded
+    splash.update_progress(10, "Loading stylesheet...")
+    load_stylesheet(app)
+
+    splash.update_progress(30, "Loading plotting libraries...")
+    from gui.main_window import MainWindow
+
+    splash.update_progress(70, "Building main window...")
+    window = MainWindow()
+
+    splash.update_progress(100, "Ready")
+    return window
+
+def main():
+    app = QApplication(sys.argv)
+
     # Create and display the splash screen
     splash = SplashScreen()
     splash.show()
+    app.processEvents()
 
-    # Initialize the main window variable
-    window = None
-
-    def show_main_window():
-        nonlocal window
-        window = MainWindow()
-        window.show()
-        # Close the splash screen after the main window is shown
-        splash.close()  # Use close() instead of finish()
-
-    # Simulate the initialization process with timers
-    progress = 0
-
-    def update_progress():
-        nonlocal progress
-        progress += 5  # Increment progress
-        splash.update_progress(progress)
-        if progress >= 100:
-            progress_timer.stop()
-            # Show the main window
-            show_main_window()
-
-    progress_timer = QTimer()
-    progress_timer.timeout.connect(update_progress)
-    progress_timer.start(100)  # Update progress every 100 ms
+    window = initialize(app, splash)
+    window.show()
+    # Close the splash screen after the main window is shown
+    splash.close()  # Use close() instead of finish()
 
     sys.exit(app.exec_())
 
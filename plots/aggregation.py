@@ -0,0 +1,160 @@
+# plots/aggregation.py
+
+import matplotlib
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+# Most bars drawn for one series; larger series are grouped or binned first
+MAX_BARS = 500
+BAR_WIDTH = 0.8
+OTHER_LABEL = 'Other'
+
+
+def is_numeric(values):
+    return values.dtype.kind in 'iuf'
+
+
+def group_means(index, y, n_groups):
+    # Mean of y per group; empty groups are drawn as zero-height bars
+    sums = np.bincount(index, weights=y, minlength=n_groups)
+    counts = np.bincount(index, minlength=n_groups)
+    means = np.zeros(n_groups, dtype=np.float64)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means, sums, counts
+
+
+def bin_numeric(x, y, max_bars=MAX_BARS):
+    """Reduces a numeric series to at most ``max_bars`` adjacent bins.
+
+    Returns (heights, edges): the mean y of the rows in each bin and the bin
+    edges. Integer x with a small enough span is grouped per value.
+    """
+    lo, hi = x.min(), x.max()
+    if x.dtype.kind in 'iu' and hi - lo < max_bars:
+        index = (x - lo).astype(np.intp)
+        n_bins = int(hi - lo) + 1
+        edges = np.arange(n_bins + 1, dtype=np.float64) + lo - 0.5
+    else:
+        n_bins = max_bars
+        if hi == lo:
+            hi = lo + 1
+        edges = np.linspace(lo, hi, n_bins + 1)
+        index = np.clip(((x - lo) * (n_bins / (hi - lo))).astype(np.intp), 0, n_bins - 1)
+    heights = group_means(index, y, n_bins)[0]
+    return heights, edges
+
+
+def group_categories(x, y, max_bars=MAX_BARS):
+    """Groups a categorical series into at most ``max_bars`` bars.
+
+    Returns (labels, heights) in order of first appearance, the height being
+    the mean y of each category. Past the cap, the largest categories are
+    kept and the rest share one "Other" bar.
+    """
+    x = x.astype(str)
+    labels, first, inverse = np.unique(x, return_index=True, return_inverse=True)
+    # np.unique sorts; restore the order in which categories appear
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    labels, index = labels[order], rank[inverse.ravel()]
+    heights, sums, counts = group_means(index, y, len(labels))
+    if len(labels) <= max_bars:
+        return list(labels), heights
+    keep = np.sort(np.argsort(-np.abs(heights), kind='stable')[:max_bars - 1])
+    rest = np.ones(len(labels), dtype=bool)
+    rest[keep] = False
+    other = sums[rest].sum() / max(counts[rest].sum(), 1)
+    return list(labels[keep]) + [OTHER_LABEL], np.append(heights[keep], other)
+
+
+def style_kwargs(label, color):
+    # Leave the colour to the axes' cycle unless one is given
+    kwargs = {'label': label}
+    if color is not None:
+        kwargs['color'] = color
+    return kwargs
+
+
+def as_float(values):
+    # Text that is not a number becomes NaN, which callers drop as non-finite
+    if is_numeric(values):
+        return values
+    import pandas as pd
+    return np.asarray(pd.to_numeric(values, errors='coerce'), dtype=np.float64)
+
+
+def finite_rows(x, y):
+    y = as_float(np.asarray(y))
+    x = np.asarray(x)
+    mask = np.isfinite(y)
+    if is_numeric(x):
+        mask &= np.isfinite(x)
+    if mask.all():
+        return x, y
+    return x[mask], y[mask]
+
+
+def draw_bars(ax, x, y, label=None, color=None, zs=None, max_bars=MAX_BARS):
+    """Bar chart with a bounded number of patches.
+
+    Series up to ``max_bars`` rows are drawn with ``ax.bar`` as before.
+    Longer numeric series are binned and drawn as one filled ``stairs``
+    patch; longer categorical ones are grouped and drawn as a single
+    PolyCollection on the category axis. In 3D (``zs`` given) the reduced
+    bars go through ``ax.bar``, which is already bounded by the cap.
+    """
+    kwargs = style_kwargs(label, color)
+    if len(x) <= max_bars:
+        if zs is not None:
+            return ax.bar(x, y, zs=zs, zdir='y', **kwargs)
+        return ax.bar(x, y, **kwargs)
+
+    x, y = finite_rows(x, y)
+    if not len(y):
+        return None
+    if is_numeric(x):
+        heights, edges = bin_numeric(x, y, max_bars)
+        if zs is not None:
+            return ax.bar(edges[:-1], heights, width=np.diff(edges), align='edge', zs=zs, zdir='y', **kwargs)
+        return ax.stairs(heights, edges, fill=True, **kwargs)
+
+    labels, heights = group_categories(x, y, max_bars)
+    if zs is not None:
+        positions = np.arange(len(labels))
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels)
+        return ax.bar(positions, heights, zs=zs, zdir='y', **kwargs)
+    # Registering the labels as units keeps the axis categorical, as ax.bar would
+    ax.xaxis.update_units(labels)
+    positions = np.asarray(ax.xaxis.convert_units(labels), dtype=np.float64)
+    left = positions - BAR_WIDTH / 2
+    right = positions + BAR_WIDTH / 2
+    bottom = np.zeros_like(heights)
+    verts = np.stack([
+        np.column_stack([left, bottom]),
+        np.column_stack([left, heights]),
+        np.column_stack([right, heights]),
+        np.column_stack([right, bottom]),
+    ], axis=1)
+    collection = PolyCollection(verts, facecolors=color if color is not None else 'C0', label=label)
+    ax.add_collection(collection, autolim=True)
+    ax.autoscale_view()
+    return collection
+
+
+def draw_histogram(ax, y=None, label=None, color=None, zs=None, counts=None, edges=None):
+    """Histogram drawn from precomputed bins as a single ``stairs`` patch.
+
+    Either pass the raw values ``y``, binned here with ``np.histogram`` over
+    the finite values (text that is not a number is skipped), or precomputed ``counts`` and ``edges``. In 3D the
+    bins are drawn with ``ax.bar`` on the offset plane ``zs``.
+    """
+    if counts is None:
+        y = as_float(np.asarray(y))
+        y = y[np.isfinite(y)]
+        counts, edges = np.histogram(y, bins=matplotlib.rcParams['hist.bins'])
+    kwargs = style_kwargs(label, color)
+    if zs is not None:
+        return ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', zs=zs, zdir='y', **kwargs)
+    return ax.stairs(counts, edges, fill=True, **kwargs)
@@ -0,0 +1,312 @@
+# plots/annotations.py
+
+import bisect
+import itertools
+
+import numpy as np
+
+from plots.downsampling import SLAB_SIZE, is_monotonic
+
+# Click distance, in pixels, within which an annotation counts as hit
+HIT_TOLERANCE = 5
+# Half-width, in pixels, of the first window searched when snapping to data
+SNAP_WINDOW = 10
+# Snapping gives up beyond this many axes widths from the click
+SNAP_MAX_WIDTHS = 4
+
+
+class Annotation:
+    """One user annotation and the artists currently drawing it.
+
+    kind is 'point', 'vline', 'hline' or 'distance'. Distances keep the two
+    line positions in ``x``/``y`` as (start, end) pairs along their axis.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, kind, x=None, y=None):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.artists = []
+
+    def position(self):
+        return self.x if self.kind == 'vline' else self.y
+
+    def to_dict(self):
+        return {'kind': self.kind, 'x': self.x, 'y': self.y}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Distance pairs come back from JSON as lists
+        x, y = data.get('x'), data.get('y')
+        if data['kind'] == 'distance':
+            x = tuple(x) if x is not None else None
+            y = tuple(y) if y is not None else None
+        return cls(data['kind'], x, y)
+
+
+def draw_annotation(ax, annotation):
+    # Creates the artists for an annotation on ax
+    if annotation.kind == 'point':
+        star, = ax.plot(annotation.x, annotation.y, marker='*', color='black', markersize=10)
+        text = ax.text(annotation.x, annotation.y, f'({annotation.x:.2f}, {annotation.y:.2f})', fontsize=10, color='black', ha='left')
+        annotation.artists = [star, text]
+    elif annotation.kind == 'vline':
+        annotation.artists = [ax.axvline(x=annotation.x, color='r', linestyle='--')]
+    elif annotation.kind == 'hline':
+        annotation.artists = [ax.axhline(y=annotation.y, color='b', linestyle='--')]
+    elif annotation.kind == 'distance' and annotation.x is not None:
+        # Horizontal arrow between two vertical lines
+        x1, x2 = annotation.x
+        y_lim = ax.get_ylim()
+        y = y_lim[1] - (y_lim[1] - y_lim[0]) * 0.05
+        arrow = ax.annotate(f'd = {abs(x2 - x1):.2f}', xy=((x1 + x2) / 2, y), xytext=((x1 + x2) / 2, y),
+                            arrowprops=dict(facecolor='black', arrowstyle='<->', lw=1.5),
+                            ha='center', va='center')
+        annotation.artists = [arrow]
+    elif annotation.kind == 'distance':
+        # Vertical arrow between two horizontal lines
+        y1, y2 = annotation.y
+        x_lim = ax.get_xlim()
+        x = x_lim[0] + (x_lim[1] - x_lim[0]) * 0.05
+        arrow = ax.annotate(f'd = {abs(y2 - y1):.2f}', xy=(x, (y1 + y2) / 2), xytext=(x, (y1 + y2) / 2),
+                            arrowprops=dict(facecolor='black', arrowstyle='<->', lw=1.5),
+                            ha='center', va='center', rotation=90)
+        annotation.artists = [arrow]
+    return annotation
+
+
+class AnnotationRegistry:
+    """All annotations of a plot, indexed for fast hit-testing.
+
+    Vertical and horizontal lines are kept sorted by position and points
+    sorted by x, so a click only looks at the neighbours found by bisection
+    rather than at every annotation.
+    """
+
+    def __init__(self):
+        self.annotations = []
+        self._vlines = []  # sorted (x, id)
+        self._hlines = []  # sorted (y, id)
+        self._points = []  # sorted (x, y, id)
+        self._point_xs = []  # x of each entry in _points
+        self._by_id = {}
+
+    def __iter__(self):
+        return iter(self.annotations)
+
+    def __len__(self):
+        return len(self.annotations)
+
+    def add(self, ax, kind, x=None, y=None):
+        annotation = draw_annotation(ax, Annotation(kind, x, y))
+        self.register(annotation)
+        return annotation
+
+    def register(self, annotation):
+        self.annotations.append(annotation)
+        self._by_id[annotation.id] = annotation
+        if annotation.kind == 'vline':
+            bisect.insort(self._vlines, (annotation.x, annotation.id))
+        elif annotation.kind == 'hline':
+            bisect.insort(self._hlines, (annotation.y, annotation.id))
+        elif annotation.kind == 'point':
+            entry = (annotation.x, annotation.y, annotation.id)
+            i = bisect.bisect_left(self._points, entry)
+            self._points.insert(i, entry)
+            self._point_xs.insert(i, annotation.x)
+
+    def remove(self, annotation):
+        for artist in annotation.artists:
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                pass  # Already gone with a cleared figure
+        annotation.artists = []
+        self.annotations.remove(annotation)
+        del self._by_id[annotation.id]
+        if annotation.kind == 'vline':
+            self._vlines.remove((annotation.x, annotation.id))
+        elif annotation.kind == 'hline':
+            self._hlines.remove((annotation.y, annotation.id))
+        elif annotation.kind == 'point':
+            i = self._points.index((annotation.x, annotation.y, annotation.id))
+            del self._points[i]
+            del self._point_xs[i]
+
+    def clear(self):
+        for annotation in list(self.annotations):
+            self.remove(annotation)
+
+    def artists(self):
+        return [artist for annotation in self.annotations for artist in annotation.artists]
+
+    def restore(self, ax):
+        # Redraws every annotation on a freshly built axes
+        for annotation in self.annotations:
+            draw_annotation(ax, annotation)
+
+    def load(self, dicts):
+        # Replaces the annotations; they are drawn by the next restore()
+        self.clear()
+        for data in dicts:
+            self.register(Annotation.from_dict(data))
+
+    def forget_artists(self):
+        # The figure was cleared; drop references to the removed artists
+        for annotation in self.annotations:
+            annotation.artists = []
+
+    def hit_test(self, ax, x_px, y_px, kinds=('vline', 'hline'), tolerance=HIT_TOLERANCE):
+        """Returns the annotation nearest to a click, if within tolerance.
+
+        x_px/y_px are display coordinates, as in a Matplotlib mouse event.
+        """
+        x, y = ax.transData.inverted().transform((x_px, y_px))
+        best, best_distance = None, tolerance
+        if 'vline' in kinds:
+            for pos, ann_id in _neighbours(self._vlines, x):
+                distance = abs(ax.transData.transform((pos, y))[0] - x_px)
+                if distance <= best_distance:
+                    best, best_distance = self._by_id[ann_id], distance
+        if 'hline' in kinds:
+            for pos, ann_id in _neighbours(self._hlines, y):
+                distance = abs(ax.transData.transform((x, pos))[1] - y_px)
+                if distance <= best_distance:
+                    best, best_distance = self._by_id[ann_id], distance
+        if 'point' in kinds:
+            point, distance = self.nearest_point(ax, x_px, y_px)
+            if point is not None and distance <= best_distance:
+                best = point
+        return best
+
+    def nearest_point(self, ax, x_px, y_px):
+        # Nearest point annotation in display space and its pixel distance
+        x = ax.transData.inverted().transform((x_px, y_px))[0]
+        found = _nearest_sorted(self._point_xs, lambda i: self._points[i][:2], x, ax, x_px, y_px)
+        if found is None:
+            return None, np.inf
+        return self._by_id[self._points[found[0]][2]], found[1]
+
+
+def _neighbours(entries, value):
+    # The entries on either side of value in a sorted list of (pos, id)
+    i = bisect.bisect_left(entries, (value, -1))
+    return entries[max(i - 1, 0):i + 1]
+
+
+def _nearest_sorted(keys, point_at, x, ax, x_px, y_px):
+    """Nearest point in display space among points sorted by x.
+
+    Scans outwards from the bisection position of x in both directions and
+    stops once the horizontal pixel distance alone exceeds the best match.
+    Returns (index, pixel distance) or None.
+    """
+    n = len(keys)
+    if n == 0:
+        return None
+    if isinstance(keys, np.ndarray):
+        start = int(np.searchsorted(keys, x))
+    else:
+        start = bisect.bisect_left(keys, x)
+    best, best_distance = None, np.inf
+    for step in (-1, 1):
+        i = start if step == 1 else start - 1
+        while 0 <= i < n:
+            px, py = ax.transData.transform(point_at(i))
+            if abs(px - x_px) > best_distance:
+                break
+            distance = np.hypot(px - x_px, py - y_px)
+            if distance < best_distance:
+                best, best_distance = i, distance
+            i += step
+    return None if best is None else (best, best_distance)
+
+
+def _window_indices(xs, lo, hi, sorted_x):
+    # Indices of the samples with lo <= x <= hi; sorted series are bisected,
+    # others scanned slab by slab without copying them
+    if sorted_x:
+        return np.arange(np.searchsorted(xs, lo, side='left'), np.searchsorted(xs, hi, side='right'))
+    found = []
+    for start in range(0, len(xs), SLAB_SIZE):
+        chunk = np.asarray(xs[start:start + SLAB_SIZE])
+        found.append(np.flatnonzero((chunk >= lo) & (chunk <= hi)) + start)
+    return np.concatenate(found)
+
+
+def _nearest_in_window(xs, ys, sorted_x, ax, x_px, y_px, half_width):
+    """Nearest sample within ``half_width`` pixels of the click horizontally.
+
+    The pixel window is mapped to a data-space x range, and only the
+    samples in it are transformed and measured, in one vectorized call.
+    Returns (index, pixel distance) or None.
+    """
+    corners = ax.transData.inverted().transform([(x_px - half_width, y_px), (x_px + half_width, y_px)])
+    lo, hi = sorted(corners[:, 0])
+    index = _window_indices(xs, lo, hi, sorted_x)
+    if not len(index):
+        return None
+    points = np.column_stack([np.asarray(xs[index], dtype=np.float64), np.asarray(ys[index], dtype=np.float64)])
+    display = ax.transData.transform(points)
+    distance = np.hypot(display[:, 0] - x_px, display[:, 1] - y_px)
+    # Points that cannot be shown (NaN, non-positive on a log scale) never win
+    distance[~np.isfinite(distance)] = np.inf
+    best = int(np.argmin(distance))
+    if not np.isfinite(distance[best]):
+        return None
+    return int(index[best]), float(distance[best])
+
+
+class SeriesIndex:
+    """Nearest-data-point lookups on plotted series.
+
+    A click looks only at the samples within a few pixels of it
+    horizontally: sorted series are bisected into, so a lookup stays
+    logarithmic in the series length, and unsorted ones are scanned
+    vectorized in place. The window widens only when the best match is
+    farther away than the window, which keeps the result exact.
+    """
+
+    def __init__(self):
+        self.series = []
+        self._sorted = False
+
+    def clear(self):
+        self.series = []
+        self._sorted = False
+
+    def add(self, x, y):
+        x = np.asarray(x)
+        y = np.asarray(y)
+        if x.dtype.kind not in 'iuf' or y.dtype.kind not in 'iuf' or not len(x):
+            return
+        self.series.append((x, y, None))
+        self._sorted = False
+
+    def prepare(self):
+        # Only checks the order (slab by slab); the series are never copied
+        if self._sorted:
+            return
+        self.series = [(x, y, is_monotonic(x) if sorted_x is None else sorted_x) for x, y, sorted_x in self.series]
+        self._sorted = True
+
+    def snap(self, ax, x_px, y_px):
+        """Returns the (x, y) data point closest to a click, or None."""
+        self.prepare()
+        best, best_distance = None, np.inf
+        for xs, ys, sorted_x in self.series:
+            half_width = SNAP_WINDOW
+            while True:
+                found = _nearest_in_window(xs, ys, sorted_x, ax, x_px, y_px, half_width)
+                if found is not None and found[1] <= half_width:
+                    break  # Anything outside the window is farther away
+                if half_width >= max(ax.bbox.width, 1) * SNAP_MAX_WIDTHS:
+                    break
+                # Widen to the best distance so far, or geometrically without a match
+                half_width = found[1] if found is not None else half_width * 4
+            if found is not None and found[1] < best_distance:
+                best, best_distance = (float(xs[found[0]]), float(ys[found[0]])), found[1]
+        return best
@@ -0,0 +1,177 @@
+# plots/batch.py
+#
+# Headless batch rendering with the same plot_data used by the GUI.
+#
+# Usage: python -m plots.batch jobs.json [--workers N]
+#
+# The job spec is a JSON file of the form
+#
+#   {
+#     "defaults": {"plot_visuals": {"plot_style": "ggplot"}, "dpi": 150},
+#     "jobs": [
+#       {
+#         "files": ["data/run_*.csv"],
+#         "output": "figures/runs.png",
+#         "plot_details": {"x_axis_col": "1", "y_axis_col": "3"},
+#         "axis_details": {"title": "Runs", "x_min": "0", "x_max": "10"},
+#         "plot_visuals": {"plot_type": "Line", "apply_legends": true},
+#         "normalization": {"method": "Min-Max"},
+#         "is_3d": false,
+#         "size": [8, 6]
+#       }
+#     ]
+#   }
+#
+# Any setting left out falls back to the GUI panel defaults. Relative paths
+# are resolved against the directory of the job spec, and the output format
+# (PNG, SVG, PDF, ...) follows the output file extension.
+
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from plots.plotting import plot_data
+
+# Same defaults as the GUI panels
+DEFAULT_PLOT_DETAILS = {
+    'x_axis_col': '1',
+    'y_axis_col': '2',
+    'line_style': 'Solid',
+    'point_style': 'None',
+    'line_thickness': '1',
+    'scale_type': 'Linear',
+}
+DEFAULT_AXIS_DETAILS = {
+    'title': '',
+    'x_label': '',
+    'y_label': '',
+    'x_min': '',
+    'x_max': '',
+    'y_min': '',
+    'y_max': '',
+    'axis_font_size': 12,
+    'title_font_size': 14,
+    'legend_font_size': 10,
+}
+DEFAULT_PLOT_VISUALS = {
+    'plot_type': 'Line',
+    'add_grid': False,
+    'add_sub_grid': False,
+    'plot_style': 'Default',
+    'apply_legends': False,
+}
+DEFAULT_NORMALIZATION = {
+    'method': 'None',
+    'baseline_min': '',
+    'baseline_max': '',
+    'reference_file': '',
+}
+DEFAULT_DPI = 100
+DEFAULT_SIZE = (8, 6)
+
+
+def resolve_job(job, defaults, base_dir):
+    def merged(key, base):
+        return {**base, **defaults.get(key, {}), **job.get(key, {})}
+
+    files = []
+    for pattern in job.get('files', []):
+        pattern = os.path.join(base_dir, os.path.expanduser(pattern))
+        matches = sorted(glob.glob(pattern))
+        files.extend(matches if matches else [pattern])
+
+    if 'output' not in job:
+        raise ValueError("job has no 'output'")
+    normalization = merged('normalization', DEFAULT_NORMALIZATION)
+    if normalization['reference_file']:
+        normalization['reference_file'] = os.path.join(base_dir, os.path.expanduser(normalization['reference_file']))
+    return {
+        'files': files,
+        'output': os.path.join(base_dir, os.path.expanduser(job['output'])),
+        'plot_details': merged('plot_details', DEFAULT_PLOT_DETAILS),
+        'axis_details': merged('axis_details', DEFAULT_AXIS_DETAILS),
+        'plot_visuals': merged('plot_visuals', DEFAULT_PLOT_VISUALS),
+        'normalization': normalization,
+        'is_3d': job.get('is_3d', defaults.get('is_3d', False)),
+        'dpi': job.get('dpi', defaults.get('dpi', DEFAULT_DPI)),
+        'size': tuple(job.get('size', defaults.get('size', DEFAULT_SIZE))),
+    }
+
+
+def load_jobs(spec_path):
+    with open(spec_path, 'r') as f:
+        spec = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(spec_path))
+    defaults = spec.get('defaults', {})
+    return [resolve_job(job, defaults, base_dir) for job in spec.get('jobs', [])]
+
+
+def render_job(job):
+    # Runs in the worker processes; uses a non-pyplot Figure on Agg
+    figure = Figure(figsize=job['size'])
+    FigureCanvasAgg(figure)
+    plot_data(figure, job['files'], job['plot_details'], job['axis_details'], job['plot_visuals'], is_3d=job['is_3d'],
+              normalization=job['normalization'])
+    output_dir = os.path.dirname(job['output'])
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    figure.savefig(job['output'], dpi=job['dpi'])
+    return job['output']
+
+
+def render_jobs(jobs, max_workers=None):
+    """Renders jobs across worker processes.
+
+    Returns the number of figures written and the elapsed wall time.
+    """
+    written = 0
+    start = time.perf_counter()
+    if max_workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            try:
+                print(f"Wrote {render_job(job)}")
+                written += 1
+            except Exception as e:
+                print(f"Error rendering {job['output']}: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(render_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    print(f"Wrote {future.result()}")
+                    written += 1
+                except Exception as e:
+                    print(f"Error rendering {futures[future]['output']}: {e}")
+    return written, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Data Viz Pro figures without a display.")
+    parser.add_argument('spec', help="JSON job spec")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Error loading job spec {args.spec}: {e}")
+        return 1
+
+    written, elapsed = render_jobs(jobs, args.workers)
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Rendered {written}/{len(jobs)} figures in {elapsed:.2f} s ({rate:.2f} figures/s)")
+    return 0 if written == len(jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
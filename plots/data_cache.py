@@ -0,0 +1,123 @@
+# plots/data_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default memory budget for parsed datasets (bytes), overridable with
+# the DATAVIZ_CACHE_MB environment variable
+DEFAULT_MEMORY_BUDGET = int(os.environ.get('DATAVIZ_CACHE_MB', 512)) * 1024 * 1024
+
+
+class DataCache:
+    """In-process LRU cache of parsed data files.
+
+    Entries are keyed by path, modification time and size, so a file that
+    changes on disk is parsed again on its next use. Least recently used
+    entries are evicted once the total size exceeds the memory budget.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_size = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, file_path, variant=None):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        return (file_path, stat.st_mtime_ns, stat.st_size, variant)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            # Drop stale versions of the same file/variant
+            for old_key in [k for k in self._entries if k[0] == key[0] and k[3] == key[3]]:
+                self._discard(old_key)
+            if size > self.memory_budget:
+                return value
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_size += size
+            self._evict()
+        return value
+
+    def get_or_load(self, file_path, loader, variant=None):
+        key = self.make_key(file_path, variant)
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, loader(file_path))
+        return value
+
+    def set_memory_budget(self, memory_budget):
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict()
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                keys = list(self._entries)
+            else:
+                file_path = os.path.abspath(file_path)
+                keys = [k for k in self._entries if k[0] == file_path]
+            for key in keys:
+                self._discard(key)
+
+    def clear(self):
+        self.invalidate()
+
+    def usage(self):
+        # (file path, variant, bytes) of every entry, most recently used last
+        with self._lock:
+            return [(key[0], key[3], self._sizes[key]) for key in self._entries]
+
+    @property
+    def total_size(self):
+        return self._total_size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        del self._entries[key]
+        self._total_size -= self._sizes.pop(key)
+
+    def _evict(self):
+        while self._total_size > self.memory_budget and self._entries:
+            self._discard(next(iter(self._entries)))
+
+
+def estimate_size(value):
+    if isinstance(value, np.memmap) or isinstance(getattr(value, 'base', None), np.memmap):
+        # Mapped pages belong to the OS page cache, not to this budget
+        return 0
+    if hasattr(value, 'memory_usage'):
+        # DataFrame; checked by attribute so pandas is not imported here
+        return int(value.memory_usage(index=True, deep=True).sum())
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(v) for v in value)
+    return 0
+
+
+# Shared cache used by plotting
+dataset_cache = DataCache()
@@ -0,0 +1,269 @@
+# plots/disk_cache.py
+#
+# On-disk cache of parsed columns, stored as .npy files next to a small
+# JSON description of the source file they came from.
+#
+# Entries beyond the size budget (DATAVIZ_DISK_CACHE_MB) are pruned least
+# recently used first whenever an entry is written.
+#
+# Usage: python -m plots.disk_cache [info|clear|prune] [--dir PATH]
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+CACHE_DIR_ENV = 'DATAVIZ_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data_viz_pro")
+META_FILE = 'meta.json'
+# Size budget of the whole cache directory (bytes)
+DEFAULT_SIZE_BUDGET = int(os.environ.get('DATAVIZ_DISK_CACHE_MB', 4096)) * 1024 * 1024
+
+
+def get_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def set_cache_dir(cache_dir):
+    # Kept in the environment so the ingestion processes see it too
+    os.environ[CACHE_DIR_ENV] = os.path.abspath(os.path.expanduser(cache_dir))
+
+
+def is_enabled():
+    return os.environ.get('DATAVIZ_DISK_CACHE', '1') != '0'
+
+
+def new_digest():
+    # Hash of source contents stored with each entry
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_hash(file_path):
+    digest = new_digest()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_dir(file_path):
+    file_path = os.path.abspath(file_path)
+    name = hashlib.sha1(file_path.encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_dir(), name)
+
+
+def column_path(directory, col):
+    return os.path.join(directory, f"col_{col}.npy")
+
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(directory, meta):
+    write_atomic(os.path.join(directory, META_FILE), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+
+def write_atomic(path, writer):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def validate_entry(file_path):
+    """Returns the metadata of a still valid cache entry, or None.
+
+    A changed mtime or size alone does not invalidate the entry: the source
+    is hashed and the entry kept if the contents are the same.
+    """
+    directory = entry_dir(file_path)
+    meta = read_meta(directory)
+    if meta is None:
+        return None
+    stat = os.stat(file_path)
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+        return meta
+    if meta['size'] == stat.st_size and meta['hash'] == file_hash(file_path):
+        meta['mtime_ns'] = stat.st_mtime_ns
+        write_meta(directory, meta)
+        return meta
+    shutil.rmtree(directory, ignore_errors=True)
+    return None
+
+
+def load_columns(file_path, columns, mmap_mode=None):
+    # Returns the cached arrays for the requested columns, or None on a miss
+    if not is_enabled():
+        return None
+    try:
+        meta = validate_entry(file_path)
+        if meta is None or not all(col in meta['columns'] for col in columns):
+            return None
+        directory = entry_dir(file_path)
+        arrays = [np.load(column_path(directory, col), mmap_mode=mmap_mode) for col in columns]
+        touch_entry(directory)
+        return arrays
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def touch_entry(directory):
+    # The meta file's mtime records the last use, for pruning
+    try:
+        os.utime(os.path.join(directory, META_FILE))
+    except OSError:
+        pass
+
+
+def save_columns(file_path, arrays, stat=None, parse_info=None, content_hash=None):
+    # arrays maps column index -> array; object columns are not cached.
+    # stat is the source as it was read, so rows appended while parsing
+    # invalidate the entry; parse_info holds parsed_bytes/open_row and
+    # content_hash the hash of the bytes that were parsed.
+    if not is_enabled():
+        return
+    arrays = {col: arr for col, arr in arrays.items() if arr.dtype.kind in 'biuf'}
+    if not arrays:
+        return
+    try:
+        directory, meta = open_entry(file_path, stat, content_hash)
+        if parse_info:
+            meta.update(parse_info)
+        for col, arr in arrays.items():
+            write_atomic(column_path(directory, col), lambda f, arr=arr: np.save(f, arr, allow_pickle=False))
+        commit_entry(directory, meta, arrays)
+    except OSError as e:
+        print(f"Error writing cache for {file_path}: {e}")
+
+
+def read_parse_info(file_path):
+    # parsed_bytes/open_row recorded when a valid entry was parsed, or {}
+    try:
+        meta = validate_entry(file_path)
+    except OSError:
+        return {}
+    if meta is None or 'parsed_bytes' not in meta:
+        return {}
+    return {'parsed_bytes': meta['parsed_bytes'], 'open_row': meta.get('open_row', False)}
+
+
+def open_entry(file_path, stat=None, content_hash=None):
+    # Returns the entry directory and its (possibly new) metadata; an entry
+    # for another version of the file than ``stat`` describes starts over.
+    # content_hash should come from the bytes as they were parsed; without
+    # it the file is read again to hash it
+    directory = entry_dir(file_path)
+    meta = validate_entry(file_path)
+    os.makedirs(directory, exist_ok=True)
+    stat = stat or os.stat(file_path)
+    if meta is None or meta['size'] != stat.st_size or meta['mtime_ns'] != stat.st_mtime_ns:
+        meta = {
+            'source': os.path.abspath(file_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': content_hash if content_hash is not None else file_hash(file_path),
+            'columns': [],
+        }
+    return directory, meta
+
+
+def commit_entry(directory, meta, columns):
+    # Records columns whose .npy files have been written to the entry
+    for col in columns:
+        if col not in meta['columns']:
+            meta['columns'].append(col)
+    write_meta(directory, meta)
+    prune_cache(keep=directory)
+
+
+def entry_usage(cache_dir=None):
+    # (last use, size in bytes, directory) of every entry
+    cache_dir = cache_dir or get_cache_dir()
+    entries = []
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return entries
+    for name in names:
+        directory = os.path.join(cache_dir, name)
+        try:
+            last_used = os.path.getmtime(os.path.join(directory, META_FILE))
+        except OSError:
+            last_used = 0.0  # Unfinished or broken entries go first
+        entries.append((last_used, cache_size(directory), directory))
+    return entries
+
+
+def prune_cache(budget=None, keep=None, cache_dir=None):
+    """Removes least recently used entries until the cache fits the budget.
+
+    ``keep`` (the entry just written) is never removed. Returns the number
+    of bytes freed.
+    """
+    budget = DEFAULT_SIZE_BUDGET if budget is None else budget
+    entries = sorted(entry_usage(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, directory in entries:
+        if total - freed <= budget:
+            break
+        if keep is not None and os.path.abspath(directory) == os.path.abspath(keep):
+            continue
+        # Mapped columns stay readable by processes that still have them open
+        shutil.rmtree(directory, ignore_errors=True)
+        freed += size
+    return freed
+
+
+def cache_size(cache_dir=None):
+    cache_dir = cache_dir or get_cache_dir()
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def clear_cache(cache_dir=None):
+    cache_dir = cache_dir or get_cache_dir()
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the Data Viz Pro column cache.")
+    parser.add_argument('command', choices=['info', 'clear', 'prune'])
+    parser.add_argument('--dir', help="cache directory (default: %(default)s)", default=get_cache_dir())
+    args = parser.parse_args(argv)
+
+    if args.command == 'clear':
+        clear_cache(args.dir)
+        print(f"Cleared cache at {args.dir}")
+    elif args.command == 'prune':
+        freed = prune_cache(cache_dir=args.dir)
+        print(f"Freed {freed / (1024 * 1024):.1f} MB from {args.dir}")
+    else:
+        print(f"Cache directory: {args.dir}")
+        print(f"Size: {cache_size(args.dir) / (1024 * 1024):.1f} MB "
+              f"(budget {DEFAULT_SIZE_BUDGET / (1024 * 1024):.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
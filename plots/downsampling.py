@@ -0,0 +1,490 @@
+# plots/downsampling.py
+
+import mmap
+
+import numpy as np
+
+# Series shorter than this many points per pixel column are drawn as is
+POINTS_PER_PIXEL = 2
+MIN_BINS = 200
+# Side of one cell of the spatial (scatter) reduction, in pixels
+GRID_CELL_PX = 2
+# Number of samples reduced at a time
+SLAB_SIZE = 4 * 1024 * 1024
+
+
+def minmax_downsample(x, y, n_bins):
+    """Reduces a series to the min and max of ``n_bins`` index bins.
+
+    Peaks survive because both extremes of every bin are kept, in their
+    original order. Returns the input unchanged if it is already small.
+    """
+    n = len(y)
+    if n_bins <= 0 or n <= POINTS_PER_PIXEL * n_bins or np.asarray(y).dtype.kind not in 'iuf':
+        return x, y
+
+    bin_size = n // n_bins
+    usable = bin_size * n_bins
+    # Work through the bins in slabs so memory-mapped series are paged in
+    # piece by piece instead of being copied whole
+    slab_bins = max(1, SLAB_SIZE // bin_size)
+    indices = []
+    for first in range(0, n_bins, slab_bins):
+        last = min(first + slab_bins, n_bins)
+        blocks = np.asarray(y[first * bin_size:last * bin_size], dtype=np.float64).reshape(last - first, bin_size)
+        offsets = np.arange(first, last) * bin_size
+        # NaNs must not win either reduction
+        indices.append(np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1) + offsets)
+        indices.append(np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offsets)
+    if usable < n:
+        tail = np.asarray(y[usable:], dtype=np.float64)
+        indices.append(np.array([
+            usable + np.argmin(np.where(np.isnan(tail), np.inf, tail)),
+            usable + np.argmax(np.where(np.isnan(tail), -np.inf, tail)),
+        ]))
+    # np.unique also puts the kept points back in their original order
+    index = np.unique(np.concatenate(indices))
+    return np.asarray(x)[index], np.asarray(y)[index]
+
+
+def finite_range(values):
+    # (min, max) over the finite values, computed slab by slab
+    lo, hi = np.inf, -np.inf
+    for start in range(0, len(values), SLAB_SIZE):
+        chunk = np.asarray(values[start:start + SLAB_SIZE], dtype=np.float64)
+        chunk = chunk[np.isfinite(chunk)]
+        if len(chunk):
+            lo, hi = min(lo, chunk.min()), max(hi, chunk.max())
+    return (lo, hi) if lo <= hi else None
+
+
+def grid_downsample(x, y, n_cols, n_rows, x_range=None, y_range=None):
+    """Keeps one point per occupied cell of an ``n_cols`` x ``n_rows`` grid.
+
+    Unlike the index-bin reduction this does not depend on the order of the
+    points, so scatter clouds and series with unsorted x keep their shape
+    and density outline. Points outside ``x_range``/``y_range`` (default:
+    the data extents) are dropped. Kept points stay in their original
+    order. Returns the input unchanged if it already fits the grid.
+    """
+    n = len(y)
+    x_arr, y_arr = np.asarray(x), np.asarray(y)
+    if n <= n_cols * n_rows or x_arr.dtype.kind not in 'iuf' or y_arr.dtype.kind not in 'iuf':
+        return x, y
+    x_range = x_range or finite_range(x)
+    y_range = y_range or finite_range(y)
+    if x_range is None or y_range is None:
+        return x_arr[:0], y_arr[:0]
+    x_scale = n_cols / ((x_range[1] - x_range[0]) or 1.0)
+    y_scale = n_rows / ((y_range[1] - y_range[0]) or 1.0)
+
+    cells, firsts = [], []
+    for start in range(0, n, SLAB_SIZE):
+        xs = np.asarray(x[start:start + SLAB_SIZE], dtype=np.float64)
+        ys = np.asarray(y[start:start + SLAB_SIZE], dtype=np.float64)
+        # NaNs fail both comparisons and are dropped with the out-of-range points
+        inside = np.flatnonzero((xs >= x_range[0]) & (xs <= x_range[1]) & (ys >= y_range[0]) & (ys <= y_range[1]))
+        col = np.minimum(((xs[inside] - x_range[0]) * x_scale).astype(np.intp), n_cols - 1)
+        row = np.minimum(((ys[inside] - y_range[0]) * y_scale).astype(np.intp), n_rows - 1)
+        slab_cells, first = np.unique(col * n_rows + row, return_index=True)
+        cells.append(slab_cells)
+        firsts.append(inside[first] + start)
+    # First point of every cell over all slabs, back in original order
+    _, first = np.unique(np.concatenate(cells), return_index=True)
+    index = np.sort(np.concatenate(firsts)[first])
+    return x_arr[index], y_arr[index]
+
+
+def is_monotonic(x):
+    x = np.asarray(x)
+    if x.dtype.kind not in 'iuf' or len(x) < 2:
+        return False
+    for start in range(0, len(x) - 1, SLAB_SIZE):
+        chunk = x[start:start + SLAB_SIZE + 1]
+        if not np.all(chunk[1:] >= chunk[:-1]):
+            return False
+    return True
+
+
+class PreviewedSeries(tuple):
+    """An (x, y) pair that also carries a precomputed min/max reduction.
+
+    It unpacks like any (x, y) pair. ``preview`` is an (x, y) reduction of
+    the full series and ``sorted_x`` whether x is known to be monotonic, so
+    the first draw neither reduces nor scans the full (e.g. memory-mapped)
+    arrays. For series parsed from text, ``parsed_bytes`` is the offset just
+    past the last complete line that was read and ``open_row`` whether the
+    last row came from an unterminated line after it, so following the file
+    resumes exactly where the parser stopped.
+    """
+
+    def __new__(cls, x, y, preview=None, sorted_x=None, parsed_bytes=None, open_row=False):
+        series = super().__new__(cls, (x, y))
+        series.preview = preview
+        series.sorted_x = sorted_x
+        series.parsed_bytes = parsed_bytes
+        series.open_row = open_row
+        return series
+
+    def __reduce__(self):
+        # Series come back from the ingestion processes by pickling
+        return (PreviewedSeries, (self[0], self[1], self.preview, self.sorted_x, self.parsed_bytes, self.open_row))
+
+
+def is_memory_mapped(array):
+    # True for memory maps and for views of them
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+class GrowableArray:
+    """1-D array with amortised constant-time appends.
+
+    The storage doubles whenever it fills up, so appending n values costs
+    O(n) overall rather than a full copy per append.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.size = len(values)
+        self._data = np.empty(max(2 * self.size, 1024), dtype=values.dtype)
+        self._data[:self.size] = values
+
+    def extend(self, values):
+        values = np.asarray(values)
+        dtype = np.result_type(self._data, values)
+        needed = self.size + len(values)
+        if needed > len(self._data) or dtype != self._data.dtype:
+            data = np.empty(max(2 * needed, len(self._data)), dtype=dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        return self._data[:self.size]
+
+
+class DecimatedSeries:
+    # Full data of one artist and the state of its incremental reduction
+    def __init__(self, artist, x, y, sorted_x, spatial=False):
+        self.artist = artist
+        self.x = x
+        self.y = y
+        self.sorted_x = sorted_x
+        # Reduced on the pixel grid rather than by index bins
+        self.spatial = spatial
+        self.buffers = None  # GrowableArrays once points are appended
+        # Memory-mapped data is not copied into the buffers when points are
+        # appended; it stays mapped here and x/y then hold the appended part
+        self.head = None
+        self.shown = None  # reduced points drawn so far, for appends
+        self.bin_size = 1
+        self.reduced_upto = len(x)  # in x/y, i.e. after the head
+        # View the drawn reduction was made for (see LevelOfDetail.view_key)
+        self.served = None
+        # (x_range, y_range) of the data, for grid reductions; None until known
+        self.extent = None
+
+    def order_free(self):
+        # Index bins only summarise series whose x is sorted
+        return self.spatial or not self.sorted_x
+
+    def parts(self):
+        return [(self.x, self.y)] if self.head is None else [self.head, (self.x, self.y)]
+
+    def last_x(self):
+        for x, _ in reversed(self.parts()):
+            if len(x):
+                return x[-1]
+        return None
+
+    def full(self):
+        # The whole series as one pair; copies only when a head is kept
+        if self.head is None:
+            return self.x, self.y
+        return np.concatenate([self.head[0], self.x]), np.concatenate([self.head[1], self.y])
+
+
+class LevelOfDetail:
+    """Keeps large line and scatter series decimated to the axes size.
+
+    Lines with sorted x are drawn from a min/max reduction over index bins
+    of about one pixel column. Scatter plots, and lines whose x is not
+    sorted, are reduced on a grid of pixel cells instead, keeping one point
+    per occupied cell, so the reduction does not depend on the row order.
+    When the limits change (zoom, pan or an explicit range), only the
+    visible part is reduced again at full resolution, so the number of
+    drawn points stays about the same whatever the file size.
+
+    Lines can also grow with ``extend``: new points are reduced at the
+    resolution of the last full reduction and appended to what is drawn,
+    so the cost follows the amount of new data rather than the series
+    length.
+    """
+
+    def __init__(self, ax, full_resolution=False):
+        self.ax = ax
+        self.series = []
+        self.following = False
+        # Draw every point, e.g. for exports that must not be decimated
+        self.full_resolution = full_resolution
+        # The callback registry only holds a weak reference to bound methods
+        ax.level_of_detail = self
+        ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+        ax.callbacks.connect('ylim_changed', self.on_ylim_changed)
+
+    def pixel_budget(self):
+        width = int(self.ax.bbox.width) if self.ax.bbox.width > 0 else 0
+        return max(width, MIN_BINS)
+
+    def pixel_grid(self):
+        height = int(self.ax.bbox.height) if self.ax.bbox.height > 0 else 0
+        return self.pixel_budget() // GRID_CELL_PX, max(height, MIN_BINS) // GRID_CELL_PX
+
+    def capacity(self, entry):
+        # Most points a reduction of this entry draws
+        if entry.order_free():
+            n_cols, n_rows = self.pixel_grid()
+            return n_cols * n_rows
+        return POINTS_PER_PIXEL * self.pixel_budget()
+
+    def visible_slice(self, x, x_range=None, sorted_x=False):
+        if x_range is None or not sorted_x:
+            return 0, len(x)
+        start = max(np.searchsorted(x, x_range[0], side='left') - 1, 0)
+        stop = min(np.searchsorted(x, x_range[1], side='right') + 1, len(x))
+        return start, stop
+
+    def reduce(self, x, y, x_range=None, sorted_x=False, spatial=False, y_range=None):
+        if spatial or not sorted_x:
+            # The grid also drops the points outside the given ranges
+            return grid_downsample(x, y, *self.pixel_grid(), x_range=x_range, y_range=y_range)
+        start, stop = self.visible_slice(x, x_range, sorted_x)
+        return minmax_downsample(x[start:stop], y[start:stop], self.pixel_budget())
+
+    def initial(self, x, y, preview, sorted_x, spatial=False):
+        # Returns the first reduction and, for grid reductions, the data
+        # extent it spans (None otherwise)
+        if self.full_resolution:
+            return x, y, None
+        # A stored min/max reduction is used when it is at least as fine as
+        # the axes; it does not summarise scatter or unsorted series
+        if preview is not None and sorted_x and not spatial \
+                and len(preview[0]) >= min(len(x), POINTS_PER_PIXEL * self.pixel_budget()):
+            return preview[0], preview[1], None
+        if not (spatial or not sorted_x):
+            return (*self.reduce(x, y, sorted_x=True), None)
+        n_cols, n_rows = self.pixel_grid()
+        if len(x) <= n_cols * n_rows:
+            return x, y, None
+        # Passing the extent in saves grid_downsample from scanning for it
+        extent = (finite_range(x), finite_range(y))
+        return (*grid_downsample(x, y, n_cols, n_rows, *extent), extent)
+
+    def plot(self, x, y, preview=None, sorted_x=None, **kwargs):
+        x, y = np.asarray(x), np.asarray(y)
+        sorted_x = is_monotonic(x) if sorted_x is None else sorted_x
+        x_plot, y_plot, extent = self.initial(x, y, preview, sorted_x)
+        line, = self.ax.plot(x_plot, y_plot, **kwargs)
+        if len(x_plot) < len(x):
+            entry = self.track(line, x, y, sorted_x, extent=extent)
+            entry.bin_size = max(1, len(x) // self.pixel_budget())
+        return line
+
+    def scatter(self, x, y, preview=None, sorted_x=None, **kwargs):
+        x, y = np.asarray(x), np.asarray(y)
+        x_plot, y_plot, extent = self.initial(x, y, preview, bool(sorted_x), spatial=True)
+        collection = self.ax.scatter(x_plot, y_plot, **kwargs)
+        if len(x_plot) < len(x):
+            self.track(collection, x, y, bool(sorted_x), spatial=True, extent=extent)
+        return collection
+
+    def track(self, artist, x, y, sorted_x=None, spatial=False, extent=None):
+        if sorted_x is None:
+            sorted_x = is_monotonic(x)
+        entry = DecimatedSeries(artist, x, y, sorted_x, spatial)
+        entry.extent = extent
+        # What is drawn now covers the whole series
+        entry.served = self.view_key(entry, None, None)
+        self.series.append(entry)
+        return entry
+
+    def find(self, artist):
+        for entry in self.series:
+            if entry.artist is artist:
+                return entry
+        return None
+
+    def redraw(self, entry, x_range=None, y_range=None):
+        parts = entry.parts()
+        if entry.order_free():
+            reduced = [grid_downsample(x, y, *self.pixel_grid(), x_range=x_range, y_range=y_range) for x, y in parts]
+        else:
+            slices = [self.visible_slice(x, x_range, entry.sorted_x) for x, _ in parts]
+            visible = sum(stop - start for start, stop in slices)
+            n_bins = self.pixel_budget()
+            # Each part gets its share of the bins
+            reduced = [
+                minmax_downsample(x[start:stop], y[start:stop], max(1, n_bins * (stop - start) // max(visible, 1)))
+                for (x, y), (start, stop) in zip(parts, slices)
+            ]
+            # Points appended later are reduced at this resolution
+            entry.bin_size = max(1, visible // n_bins)
+        if len(reduced) == 1:
+            x_plot, y_plot = reduced[0]
+        else:
+            x_plot = np.concatenate([np.asarray(x) for x, _ in reduced])
+            y_plot = np.concatenate([np.asarray(y) for _, y in reduced])
+        if hasattr(entry.artist, 'set_data'):
+            entry.artist.set_data(x_plot, y_plot)
+        else:
+            entry.artist.set_offsets(np.column_stack([x_plot, y_plot]))
+        entry.reduced_upto = len(entry.x)
+        entry.shown = None
+        entry.served = self.view_key(entry, x_range, y_range)
+
+    def data_extent(self, entry):
+        # Computed once, for entries that became order free while appending
+        if entry.extent is None:
+            x_ranges = [r for r in (finite_range(x) for x, _ in entry.parts()) if r is not None]
+            y_ranges = [r for r in (finite_range(y) for _, y in entry.parts()) if r is not None]
+            entry.extent = (
+                (min(r[0] for r in x_ranges), max(r[1] for r in x_ranges)) if x_ranges else None,
+                (min(r[0] for r in y_ranges), max(r[1] for r in y_ranges)) if y_ranges else None,
+            )
+        return entry.extent
+
+    def view_key(self, entry, x_range, y_range):
+        """Describes the points a reduction for this view would draw.
+
+        Equal keys mean redrawing would give the same result. Index bins
+        depend only on the visible slice of each part, so any view showing
+        all the data matches the first reduction (or stored preview). A grid
+        reduction over a view that contains the whole data extent is keyed
+        like the full one, drawn over the extent itself.
+        """
+        if entry.order_free():
+            if x_range is not None and y_range is not None:
+                x_extent, y_extent = self.data_extent(entry)
+                if x_extent is None or y_extent is None or (
+                        x_range[0] <= x_extent[0] and x_extent[1] <= x_range[1]
+                        and y_range[0] <= y_extent[0] and y_extent[1] <= y_range[1]):
+                    x_range = y_range = None
+            return ('grid', self.pixel_grid(), x_range and tuple(x_range), y_range and tuple(y_range))
+        slices = tuple(self.visible_slice(x, x_range, entry.sorted_x) for x, _ in entry.parts())
+        return ('bins', self.pixel_budget(), slices)
+
+    def refresh(self, entry, x_range, y_range):
+        # Reduce again only when the view needs other points than are drawn
+        key = self.view_key(entry, x_range, y_range)
+        if key == entry.served:
+            return
+        if key[0] == 'grid' and key[2] is None:
+            # The view contains all the data; reduce over its own extent
+            x_range = y_range = None
+        self.redraw(entry, x_range, y_range)
+
+    def view_ranges(self, ax):
+        return sorted(ax.get_xlim()), sorted(ax.get_ylim())
+
+    def on_xlim_changed(self, ax):
+        # Limits that only follow appended data need no new reduction
+        if self.following:
+            return
+        x_range, y_range = self.view_ranges(ax)
+        for entry in self.series:
+            self.refresh(entry, x_range, y_range)
+
+    def on_ylim_changed(self, ax):
+        # Index bins span whole columns; only grid reductions depend on y
+        if self.following:
+            return
+        x_range, y_range = self.view_ranges(ax)
+        for entry in self.series:
+            if entry.order_free():
+                self.refresh(entry, x_range, y_range)
+
+    def extend(self, line, x_new, y_new):
+        """Appends points to a line drawn by ``plot`` and updates its data."""
+        entry = self.find(line)
+        if entry is None:
+            # Lines short enough to be drawn whole are tracked from now on
+            entry = self.track(line, np.asarray(line.get_xdata()), np.asarray(line.get_ydata()))
+        if entry.buffers is None:
+            if is_memory_mapped(entry.x) or is_memory_mapped(entry.y):
+                # Keep the mapped data as is; only appended points are buffered
+                entry.head = (entry.x, entry.y)
+                entry.buffers = (GrowableArray(np.empty(0, dtype=np.asarray(entry.x[:0]).dtype)),
+                                 GrowableArray(np.empty(0, dtype=np.asarray(entry.y[:0]).dtype)))
+                entry.reduced_upto = 0
+            else:
+                entry.buffers = (GrowableArray(entry.x), GrowableArray(entry.y))
+        if entry.shown is None:
+            entry.shown = (GrowableArray(line.get_xdata()), GrowableArray(line.get_ydata()))
+        x_new, y_new = np.asarray(x_new), np.asarray(y_new)
+        if not len(x_new):
+            return
+        if entry.sorted_x:
+            last_x = entry.last_x()
+            entry.sorted_x = (last_x is None or x_new[0] >= last_x) and is_monotonic(x_new)
+
+        x_buffer, y_buffer = entry.buffers
+        x_buffer.extend(x_new)
+        y_buffer.extend(y_new)
+        entry.x, entry.y = x_buffer.view(), y_buffer.view()
+
+        if entry.order_free():
+            if entry.extent is not None:
+                # Widen the known extent by the new points
+                entry.extent = tuple(
+                    old if new is None else new if old is None else (min(old[0], new[0]), max(old[1], new[1]))
+                    for old, new in zip(entry.extent, (finite_range(x_new), finite_range(y_new)))
+                )
+            # Grid cells do not depend on order; reduce just the new points
+            x_plot, y_plot = grid_downsample(x_new, y_new, *self.pixel_grid())
+            entry.shown[0].extend(x_plot)
+            entry.shown[1].extend(y_plot)
+            entry.reduced_upto = len(entry.x)
+        else:
+            # Reduce every complete bin of new points; the last partial bin
+            # is drawn as is until it fills up
+            n_bins = (len(entry.x) - entry.reduced_upto) // entry.bin_size
+            if n_bins:
+                stop = entry.reduced_upto + n_bins * entry.bin_size
+                x_plot, y_plot = minmax_downsample(entry.x[entry.reduced_upto:stop], entry.y[entry.reduced_upto:stop], n_bins)
+                entry.shown[0].extend(x_plot)
+                entry.shown[1].extend(y_plot)
+                entry.reduced_upto = stop
+        shown_x, shown_y = entry.shown
+        if shown_x.size > 2 * self.capacity(entry):
+            # Twice as much data as at the last reduction; start over at a
+            # coarser resolution (amortised over the points appended since)
+            self.redraw(entry, *self.follow_ranges())
+            return
+        line.set_data(np.concatenate([shown_x.view(), entry.x[entry.reduced_upto:]]),
+                      np.concatenate([shown_y.view(), entry.y[entry.reduced_upto:]]))
+
+    def follow_ranges(self):
+        # Autoscaled axes follow the data, so the whole series is reduced
+        x_range = None if self.ax.get_autoscalex_on() else sorted(self.ax.get_xlim())
+        y_range = None if self.ax.get_autoscaley_on() else sorted(self.ax.get_ylim())
+        return x_range, y_range
+
+    def follow(self):
+        # Rescale to appended data without reducing every series again.
+        # Animated lines (cursor previews) are not data; relim skips hidden ones
+        previews = [line for line in self.ax.lines if line.get_animated() and line.get_visible()]
+        self.following = True
+        try:
+            for line in previews:
+                line.set_visible(False)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        finally:
+            for line in previews:
+                line.set_visible(True)
+            self.following = False
@@ -0,0 +1,244 @@
+# plots/export.py
+
+import mmap
+import multiprocessing
+import os
+import re
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from plots.annotations import Annotation, draw_annotation
+from plots.downsampling import PreviewedSeries
+from plots.plotting import plot_data
+
+# Output presets: name, DPI and figure size in inches (None keeps the
+# size of the plot on screen)
+EXPORT_PRESETS = [
+    {'name': 'Screen', 'dpi': 100, 'size': None},
+    {'name': 'Print', 'dpi': 300, 'size': None},
+    {'name': 'Single column', 'dpi': 300, 'size': (3.5, 2.6)},
+    {'name': 'Double column', 'dpi': 300, 'size': (7.2, 4.5)},
+    {'name': 'Slide', 'dpi': 150, 'size': (13.33, 7.5)},
+    {'name': 'Poster', 'dpi': 600, 'size': (16, 10)},
+]
+VECTOR_FORMATS = ('svg', 'pdf', 'eps', 'ps')
+# Artists with more drawn points than this are rasterized in vector output
+RASTERIZE_POINTS = 5000
+
+
+def current_datasets(state):
+    # The plotted datasets, with the points appended to followed lines since
+    lod = getattr(state['ax'], 'level_of_detail', None)
+    datasets = list(state['datasets'])
+    if lod is None:
+        return datasets
+    for i, file_path in enumerate(state['data_files']):
+        entry = lod.find(state['line_by_file'].get(file_path))
+        if entry is not None and entry.buffers is not None:
+            # Views of the grown buffers; later appends do not change them
+            datasets[i] = entry.full()
+    return datasets
+
+
+def snapshot(figure, annotations=(), text_items=()):
+    """Everything needed to draw the current plot again, off the GUI figure.
+
+    Taken on the GUI thread; the export worker or the expanded window then
+    draw their own Figure from it, so no file is read again and the
+    on-screen figure is never touched. Returns None when nothing has been
+    plotted.
+    """
+    state = getattr(figure, 'plot_state', None)
+    if state is None:
+        return None
+    ax = state['ax']
+    return {
+        'data_files': list(state['data_files']),
+        # Already normalized, so normalization is not applied again
+        'datasets': current_datasets(state),
+        'plot_details': dict(state['plot_details']),
+        'axis_details': dict(state['axis_details']),
+        'plot_visuals': dict(state['plot_visuals']),
+        'is_3d': state['is_3d'],
+        'size': tuple(figure.get_size_inches()),
+        'xlim': ax.get_xlim(),
+        'ylim': ax.get_ylim(),
+        'view': (ax.elev, ax.azim) if state['is_3d'] else None,
+        'annotations': [annotation.to_dict() for annotation in annotations],
+        'text_items': [
+            {'text': t.get_text(), 'x': t.get_position()[0], 'y': t.get_position()[1],
+             'size': t.get_fontsize(), 'color': t.get_color()}
+            for t in text_items
+        ],
+    }
+
+
+class MappedArray:
+    # Picklable stand-in for a memory-mapped array or a strided view of one
+    # (e.g. a column of a 2-D .npy file); the worker maps the file again
+    # instead of receiving a copy of its data
+    def __init__(self, array, root):
+        self.filename = root.filename
+        # File offset of the first element: the mapping's own offset plus
+        # how far into it the view starts
+        start = array.__array_interface__['data'][0] - root.__array_interface__['data'][0]
+        self.offset = root.offset + start
+        self.dtype = array.dtype
+        self.shape = array.shape
+        self.strides = array.strides
+
+    def open(self):
+        if not all(self.shape):
+            return np.empty(self.shape, dtype=self.dtype)
+        span = sum((n - 1) * stride for n, stride in zip(self.shape, self.strides)) + self.dtype.itemsize
+        data = np.memmap(self.filename, dtype=np.uint8, mode='r', offset=self.offset, shape=(span,))
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=data, strides=self.strides)
+
+
+def mapped_root(array):
+    # The memmap that owns the mapping an array views, or None
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap):
+            return array
+        array = array.base
+    return None
+
+
+def portable_array(array):
+    root = mapped_root(array)
+    # A view with negative strides does not start at its lowest byte
+    if root is not None and root.filename and all(stride >= 0 for stride in array.strides):
+        return MappedArray(array, root)
+    return array
+
+
+def local_array(array):
+    return array.open() if isinstance(array, MappedArray) else array
+
+
+def portable_snapshot(snap):
+    # (x, y) pairs become dicts: PreviewedSeries does not survive pickling
+    datasets = []
+    for dataset in snap['datasets']:
+        if isinstance(dataset, PreviewedSeries) or type(dataset) is tuple:
+            dataset = {'x': portable_array(dataset[0]), 'y': portable_array(dataset[1]),
+                       'sorted_x': getattr(dataset, 'sorted_x', None)}
+        datasets.append(dataset)
+    return dict(snap, datasets=datasets)
+
+
+def local_snapshot(snap):
+    datasets = [
+        PreviewedSeries(local_array(d['x']), local_array(d['y']), sorted_x=d['sorted_x']) if isinstance(d, dict) else d
+        for d in snap['datasets']
+    ]
+    return dict(snap, datasets=datasets)
+
+
+def preset_path(output, preset, n_presets):
+    # One preset writes to the chosen path, several get a suffix each
+    if n_presets == 1:
+        return output
+    root, ext = os.path.splitext(output)
+    slug = re.sub(r'[^a-z0-9]+', '_', preset['name'].lower()).strip('_')
+    return f"{root}_{slug}_{preset['dpi']}dpi{ext}"
+
+
+def drawn_points(artist):
+    if hasattr(artist, 'get_xdata'):
+        return len(artist.get_xdata())
+    if isinstance(artist, LineCollection):
+        # Includes Line3DCollection waterfalls; their offsets are a 1x2 default.
+        # 3-D segments are only projected to 2-D on the first draw
+        segments = artist.get_segments() or getattr(artist, '_segments3d', [])
+        return sum(len(segment) for segment in segments)
+    if hasattr(artist, 'get_offsets'):
+        return len(artist.get_offsets())
+    return 0
+
+
+def rasterize_dense(ax, threshold=RASTERIZE_POINTS):
+    # Dense series become one embedded image; axes, text and annotations stay vector
+    for artist in list(ax.lines) + list(ax.collections):
+        artist.set_rasterized(drawn_points(artist) > threshold)
+
+
+def draw_snapshot(figure, snap, full_resolution=False):
+    plot_data(figure, snap['data_files'], snap['plot_details'], snap['axis_details'], snap['plot_visuals'],
+              is_3d=snap['is_3d'], datasets=snap['datasets'], full_resolution=full_resolution)
+    ax = figure.plot_state['ax']
+    if snap['is_3d']:
+        ax.view_init(*snap['view'])
+    else:
+        for data in snap['annotations']:
+            draw_annotation(ax, Annotation.from_dict(data))
+        for item in snap['text_items']:
+            ax.text(item['x'], item['y'], item['text'], fontsize=item['size'], color=item['color'], ha='left')
+    # The view on screen, including any zoom
+    ax.set_xlim(snap['xlim'])
+    ax.set_ylim(snap['ylim'])
+
+
+def export_preset(snap, path, preset, rasterize=True, full_resolution=False):
+    """Draws the snapshot at one preset's size and DPI and saves it to ``path``.
+
+    Runs in an export worker process: matplotlib keeps global state
+    (rcParams swapped by style contexts, font caches) that must not be
+    shared with the GUI thread while it draws.
+    """
+    snap = local_snapshot(snap)
+    figure = Figure(figsize=preset['size'] or snap['size'], dpi=preset['dpi'])
+    FigureCanvasAgg(figure)
+    draw_snapshot(figure, snap, full_resolution)
+    ax = figure.plot_state['ax']
+    if os.path.splitext(path)[1].lower().lstrip('.') in VECTOR_FORMATS:
+        rasterize_dense(ax, RASTERIZE_POINTS if rasterize else float('inf'))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    figure.savefig(path, dpi=preset['dpi'])
+    return path
+
+
+def export_plot(snap, output, presets, rasterize=True, full_resolution=False, on_progress=None, is_cancelled=None,
+                max_workers=None):
+    """Writes the snapshot once per preset and returns the written paths.
+
+    Every preset is drawn and saved in a separate process (started with
+    ``spawn``, as the caller is a thread of the GUI process), so nothing
+    here touches matplotlib state in this process. Memory-mapped datasets
+    and views of them are mapped again by the workers rather than copied
+    to them. The format follows the output extension. When cancelled, or
+    when a preset fails, the workers are terminated instead of waited for.
+    """
+    portable = portable_snapshot(snap)
+    max_workers = max_workers or min(len(presets), os.cpu_count() or 1)
+    written = []
+    pool = multiprocessing.get_context('spawn').Pool(max(max_workers, 1))
+    pending = []
+    try:
+        pending = [
+            pool.apply_async(export_preset, (portable, preset_path(output, preset, len(presets)), preset,
+                                             rasterize, full_resolution))
+            for preset in presets
+        ]
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                break
+            pending[0].wait(0.2)
+            for result in [result for result in pending if result.ready()]:
+                pending.remove(result)
+                # Errors are raised to the caller, as for a single export
+                written.append(result.get())
+                if on_progress is not None:
+                    on_progress(len(written), len(presets))
+    finally:
+        if pending:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+    return written
@@ -0,0 +1,219 @@
+# plots/ingestion.py
+
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from plots import disk_cache
+from plots.data_cache import dataset_cache
+from plots.downsampling import PreviewedSeries
+from plots.mmap_loader import (
+    NonNumericColumnError, PrefixReader, map_columns, parse_info, prepare_columns, should_map
+)
+from plots.streaming import should_stream, stream_histogram
+
+# Upper bound on parser processes, whatever the core count
+DEFAULT_MAX_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_columns(plot_details):
+    x_col = int(plot_details['x_axis_col']) - 1
+    y_col = int(plot_details['y_axis_col']) - 1
+    return x_col, y_col
+
+
+def parse_columns(file_path, x_col, y_col):
+    # Runs in the pool processes, so it must stay a picklable top-level function.
+    # Only the plotted columns are parsed; usecols returns them in file order.
+    # The result records where parsing stopped (see PreviewedSeries)
+    cached = disk_cache.load_columns(file_path, [x_col, y_col])
+    if cached is not None:
+        return PreviewedSeries(*cached, **disk_cache.read_parse_info(file_path))
+    import pandas as pd
+    columns = sorted({x_col, y_col})
+    # Parse the bytes present at this stat; rows appended meanwhile are
+    # picked up by the next load or a live follower
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        info = parse_info(f, stat.st_size)
+        f.seek(0)
+        # The cache entry records the hash of the bytes parsed here
+        digest = disk_cache.new_digest() if disk_cache.is_enabled() else None
+        # Parsed straight from the file, so only the selected columns are held
+        df = pd.read_csv(io.BufferedReader(PrefixReader(f, stat.st_size, digest)), usecols=columns)
+    x = compact_array(df.iloc[:, columns.index(x_col)].to_numpy())
+    y = compact_array(df.iloc[:, columns.index(y_col)].to_numpy())
+    disk_cache.save_columns(
+        file_path, {x_col: x, y_col: y}, stat=stat, parse_info=info,
+        content_hash=digest.hexdigest() if digest is not None else None
+    )
+    return PreviewedSeries(x, y, **info)
+
+
+def compact_array(values):
+    # Downcast to 32-bit only when the plotted values stay the same at the
+    # scale of the data, e.g. not for epoch timestamps with small steps
+    if values.dtype == np.float64:
+        compact = values.astype(np.float32)
+        finite = np.isfinite(values)
+        if not finite.any():
+            return compact
+        span = values[finite].max() - values[finite].min()
+        error = np.abs(compact[finite].astype(np.float64) - values[finite]).max()
+        if error <= span * 1e-6 and np.isfinite(compact[finite]).all():
+            return compact
+    elif values.dtype == np.int64 and len(values):
+        info = np.iinfo(np.int32)
+        if info.min <= values.min() and values.max() <= info.max:
+            return values.astype(np.int32)
+    return values
+
+
+def streams_histogram(file_path, histogram):
+    return histogram and should_stream(file_path)
+
+
+def dataset_variant(file_path, x_col, y_col, histogram=False):
+    if streams_histogram(file_path, histogram):
+        return ('hist', y_col)
+    return ('xy', x_col, y_col)
+
+
+def read_columns(file_path, x_col, y_col, histogram=False):
+    # Histograms of large files come back as a StreamedHistogram of counts
+    if streams_histogram(file_path, histogram):
+        return stream_histogram(file_path, y_col)
+    if should_map(file_path):
+        try:
+            return map_columns(file_path, x_col, y_col)
+        except NonNumericColumnError:
+            pass  # Text columns are parsed in memory, as for smaller files
+    return parse_columns(file_path, x_col, y_col)
+
+
+def parse_in_pool(file_path, x_col, y_col, histogram=False):
+    if streams_histogram(file_path, histogram):
+        return stream_histogram(file_path, y_col)
+    # Large files are only converted in the pool and mapped by the caller,
+    # since sending a memory map back through pickling would copy all of it
+    if should_map(file_path):
+        try:
+            prepare_columns(file_path, x_col, y_col)
+            return None
+        except NonNumericColumnError:
+            pass  # Text columns are parsed in memory, as for smaller files
+    return parse_columns(file_path, x_col, y_col)
+
+
+def load_columns(file_path, x_col, y_col, histogram=False):
+    return dataset_cache.get_or_load(
+        file_path, lambda path: read_columns(path, x_col, y_col, histogram),
+        variant=dataset_variant(file_path, x_col, y_col, histogram)
+    )
+
+
+def get_executor(max_workers=None):
+    global _executor, _executor_workers
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # Created from a thread of the (multi-threaded) GUI process, where
+            # fork can deadlock on locks held by other threads
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+            _executor_workers = max_workers
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def load_files_parallel(data_files, plot_details, on_result=None, is_cancelled=None, max_workers=None, histogram=False):
+    """Parses the X/Y columns of several files concurrently.
+
+    Files already in the dataset cache are served from it; the rest are
+    parsed on a bounded process pool. Returns a list of (x, y) NumPy array
+    pairs in the order of ``data_files``, with None for files that failed.
+    ``on_result(index, file_path, dataset, error)`` is called as each file
+    completes, and a truthy ``is_cancelled()`` stops scheduling further work.
+    With ``histogram=True`` large files are reduced to a StreamedHistogram
+    in the pool instead of being loaded.
+    """
+    datasets = [None] * len(data_files)
+
+    def report(i, dataset, error):
+        if error is not None:
+            print(f"Error loading file {data_files[i]}: {error}")
+        if on_result is not None:
+            on_result(i, data_files[i], dataset, error)
+
+    try:
+        x_col, y_col = get_columns(plot_details)
+    except Exception as e:
+        for i in range(len(data_files)):
+            report(i, None, e)
+        return datasets
+
+    pending = {}
+    for i, file_path in enumerate(data_files):
+        try:
+            key = dataset_cache.make_key(file_path, dataset_variant(file_path, x_col, y_col, histogram))
+        except Exception as e:
+            report(i, None, e)
+            continue
+        cached = dataset_cache.get(key)
+        if cached is not None:
+            datasets[i] = cached
+            report(i, cached, None)
+        else:
+            pending[i] = key
+
+    if not pending:
+        return datasets
+
+    # A single file is not worth the inter-process round trip
+    if len(pending) == 1:
+        (i, key), = pending.items()
+        try:
+            datasets[i] = dataset_cache.put(key, read_columns(data_files[i], x_col, y_col, histogram))
+            report(i, datasets[i], None)
+        except Exception as e:
+            report(i, None, e)
+        return datasets
+
+    executor = get_executor(max_workers)
+    futures = {
+        executor.submit(parse_in_pool, data_files[i], x_col, y_col, histogram): i
+        for i in pending
+    }
+    try:
+        for future in as_completed(futures):
+            if is_cancelled is not None and is_cancelled():
+                break
+            i = futures[future]
+            try:
+                result = future.result()
+                if result is None:
+                    result = map_columns(data_files[i], x_col, y_col)
+                datasets[i] = dataset_cache.put(pending[i], result)
+                report(i, datasets[i], None)
+            except Exception as e:
+                report(i, None, e)
+    finally:
+        for future in futures:
+            future.cancel()
+    return datasets
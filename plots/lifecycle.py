@@ -0,0 +1,135 @@
+# plots/lifecycle.py
+
+import gc
+import weakref
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from plots.data_cache import dataset_cache, estimate_size
+
+
+def artist_size(artist):
+    # Bytes of the data an artist draws (its own copies, not the source arrays)
+    if hasattr(artist, 'get_xdata'):
+        return estimate_size((np.asarray(artist.get_xdata()), np.asarray(artist.get_ydata())))
+    size = 0
+    if hasattr(artist, 'get_offsets'):
+        size += estimate_size(np.asarray(artist.get_offsets()))
+    if hasattr(artist, 'get_paths'):
+        size += sum(path.vertices.nbytes for path in artist.get_paths())
+    elif hasattr(artist, 'get_array') and artist.get_array() is not None:
+        size += estimate_size(np.asarray(artist.get_array()))
+    return size
+
+
+def figure_artists(figure):
+    return [artist for ax in figure.axes for artist in list(ax.lines) + list(ax.collections) + list(ax.patches) + list(ax.images)]
+
+
+class FigureRegistry:
+    """Creates the application's figures and keeps track of their lifetime.
+
+    Figures are plain matplotlib Figures rather than pyplot ones, so nothing
+    but their window holds them. The registry only keeps weak references:
+    ``release`` clears a figure when its window closes, and a released
+    figure that is still alive afterwards shows up in ``report`` as a leak.
+    """
+
+    def __init__(self):
+        self._figures = {}  # id -> (name, weakref)
+        self._released = {}  # id -> (name, weakref) of released figures
+
+    def new_figure(self, name, **kwargs):
+        figure = Figure(**kwargs)
+        self._figures[id(figure)] = (name, weakref.ref(figure, self._forget))
+        return figure
+
+    def _forget(self, ref):
+        for table in (self._figures, self._released):
+            for key, (_, figure_ref) in list(table.items()):
+                if figure_ref is ref:
+                    del table[key]
+
+    def release(self, figure):
+        # Removes every artist and the loaded data the figure keeps
+        if figure is None:
+            return
+        entry = self._figures.pop(id(figure), None)
+        figure.clear()
+        figure.plot_state = None
+        if entry is not None:
+            self._released[id(figure)] = entry
+
+    def release_all(self):
+        for figure in self.figures():
+            self.release(figure)
+
+    def figures(self):
+        return [figure for _, figure in self.live()]
+
+    def live(self):
+        # (name, figure) of the figures that have not been released
+        return [(name, ref()) for name, ref in list(self._figures.values()) if ref() is not None]
+
+    def leaked(self):
+        # Names of released figures that something still references
+        gc.collect()
+        return [name for name, ref in self._released.values() if ref() is not None]
+
+    def report(self):
+        """Memory held by each live figure and by each loaded dataset.
+
+        Figures report their drawn data separately from the datasets they
+        plot; datasets are listed once per file, whether they are held by a
+        figure, by the dataset cache or both. Memory-mapped arrays count as
+        zero, as their pages belong to the OS page cache.
+        """
+        figures = []
+        datasets = {}
+        for name, figure in self.live():
+            state = getattr(figure, 'plot_state', None) or {}
+            artists = figure_artists(figure)
+            figures.append({
+                'name': name,
+                'artists': len(artists),
+                'drawn_bytes': sum(artist_size(artist) for artist in artists),
+            })
+            for file_path, dataset in zip(state.get('data_files', []), state.get('datasets', [])):
+                entry = datasets.setdefault(file_path, {'path': file_path, 'figure_bytes': 0, 'cache_bytes': 0})
+                entry['figure_bytes'] += estimate_size(dataset)
+        for file_path, _, size in dataset_cache.usage():
+            entry = datasets.setdefault(file_path, {'path': file_path, 'figure_bytes': 0, 'cache_bytes': 0})
+            entry['cache_bytes'] += size
+        return {
+            'figures': figures,
+            'datasets': sorted(datasets.values(), key=lambda d: -(d['figure_bytes'] + d['cache_bytes'])),
+            'cache_bytes': dataset_cache.total_size,
+            'cache_budget': dataset_cache.memory_budget,
+            'leaked': self.leaked(),
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = ["Figures:"]
+        for figure in report['figures']:
+            lines.append(f"  {figure['name']}: {figure['artists']} artists, {format_bytes(figure['drawn_bytes'])} drawn")
+        lines.append(f"Datasets (cache {format_bytes(report['cache_bytes'])} of {format_bytes(report['cache_budget'])}):")
+        for dataset in report['datasets']:
+            lines.append(f"  {dataset['path']}: {format_bytes(dataset['figure_bytes'])} plotted, "
+                         f"{format_bytes(dataset['cache_bytes'])} cached")
+        if report['leaked']:
+            lines.append(f"Released figures still referenced: {', '.join(report['leaked'])}")
+        return "\n".join(lines)
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+# Shared registry of the figures shown by the GUI
+figure_registry = FigureRegistry()
@@ -0,0 +1,81 @@
+# plots/live.py
+
+import io
+import os
+
+import numpy as np
+
+from plots.mmap_loader import is_mapped_format
+
+# Largest chunk of appended bytes parsed at once
+MAX_TAIL_BYTES = 64 * 1024 * 1024
+
+
+class TailReader:
+    """Reads the rows appended to a CSV file since the last read.
+
+    Only the bytes after ``offset`` are read, up to the last complete line,
+    so a row still being written is picked up on the next read. With
+    ``skip_row`` the first line read is dropped: the loader already parsed
+    it while it was still unterminated. ``read`` returns None when the file
+    shrank or was replaced and has to be loaded again from the start.
+    """
+
+    def __init__(self, file_path, x_col, y_col, offset=None, skip_row=False):
+        self.file_path = file_path
+        self.x_col = x_col
+        self.y_col = y_col
+        stat = os.stat(file_path)
+        self.inode = stat.st_ino
+        self.offset = stat.st_size if offset is None else offset
+        self.skip_row = skip_row
+        # Set when a read stopped at MAX_TAIL_BYTES with more data waiting
+        self.more = False
+
+    @staticmethod
+    def supports(file_path):
+        return not is_mapped_format(file_path)
+
+    def read(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError as e:
+            print(f"Error watching file {self.file_path}: {e}")
+            return None
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            return None
+        if stat.st_size == self.offset:
+            return empty_columns()
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(stat.st_size - self.offset, MAX_TAIL_BYTES))
+        self.more = stat.st_size - self.offset > MAX_TAIL_BYTES
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return empty_columns()
+        self.offset += end
+        if self.skip_row:
+            self.skip_row = False
+            first = data.find(b'\n') + 1
+            if first == end:
+                return empty_columns()
+            data = data[first:end]
+            end = len(data)
+        return self.parse(data[:end])
+
+    def parse(self, data):
+        import pandas as pd
+        columns = sorted({self.x_col, self.y_col})
+        try:
+            df = pd.read_csv(io.BytesIO(data), header=None, usecols=columns)
+        except (ValueError, pd.errors.ParserError) as e:
+            print(f"Error parsing appended rows of {self.file_path}: {e}")
+            return empty_columns()
+        x = df.iloc[:, columns.index(self.x_col)].to_numpy()
+        y = df.iloc[:, columns.index(self.y_col)].to_numpy()
+        return x, y
+
+
+def empty_columns():
+    return np.empty(0), np.empty(0)
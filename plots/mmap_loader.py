@@ -0,0 +1,207 @@
+# plots/mmap_loader.py
+#
+# Memory-mapped access to large fixed-layout numeric data. Pages of the
+# mapped files are only read when a slice of them is used, so plotting a
+# decimated view of a 10+ GB trace stays within a small resident footprint.
+#
+# Supported sources:
+#   - .npy arrays (1D, or 2D with one column per channel)
+#   - raw binary (.bin/.raw/.dat) described by a "<file>.json" sidecar,
+#     e.g. {"dtype": "<f4", "columns": 8, "offset": 0}
+#   - CSV files above MMAP_THRESHOLD, converted once into the .npy disk cache
+
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from plots import disk_cache
+from plots.downsampling import PreviewedSeries
+
+RAW_EXTENSIONS = ('.bin', '.raw', '.dat')
+MAPPED_EXTENSIONS = ('.npy',) + RAW_EXTENSIONS
+# CSV files at least this large are converted and mapped instead of parsed
+MMAP_THRESHOLD = int(os.environ.get('DATAVIZ_MMAP_MB', 1024)) * 1024 * 1024
+CSV_CHUNK_ROWS = 1000000
+# Block size when searching backwards for the last line break
+TAIL_BLOCK = 64 * 1024
+
+
+class NonNumericColumnError(ValueError):
+    # A CSV column holds text (e.g. timestamps) and cannot be converted
+    pass
+
+
+def is_mapped_format(file_path):
+    return os.path.splitext(file_path)[1].lower() in MAPPED_EXTENSIONS
+
+
+def should_map(file_path):
+    if is_mapped_format(file_path):
+        return True
+    try:
+        return os.path.getsize(file_path) >= MMAP_THRESHOLD
+    except OSError:
+        return False
+
+
+def read_raw_layout(file_path):
+    layout_path = file_path + '.json'
+    if not os.path.exists(layout_path):
+        raise ValueError(f"missing layout description {layout_path}")
+    with open(layout_path, 'r') as f:
+        layout = json.load(f)
+    return np.dtype(layout.get('dtype', '<f8')), int(layout.get('columns', 1)), int(layout.get('offset', 0))
+
+
+def map_array(file_path):
+    # Returns a read-only (rows, columns) view of a .npy or raw binary file
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.npy':
+        array = np.load(file_path, mmap_mode='r')
+    else:
+        dtype, n_cols, offset = read_raw_layout(file_path)
+        n_rows = (os.path.getsize(file_path) - offset) // (dtype.itemsize * n_cols)
+        array = np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=(n_rows, n_cols))
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+    elif array.ndim != 2:
+        raise ValueError(f"expected a 1D or 2D array, got shape {array.shape}")
+    return array
+
+
+def last_line_end(f, size):
+    # Offset just past the last line break in the first ``size`` bytes of f
+    end = size
+    while end > 0:
+        start = max(end - TAIL_BLOCK, 0)
+        f.seek(start)
+        block = f.read(end - start)
+        found = block.rfind(b'\n')
+        if found >= 0:
+            return start + found + 1
+        end = start
+    return 0
+
+
+def parse_info(f, size):
+    # Where a parse of the first ``size`` bytes of f stopped, for followers
+    end = last_line_end(f, size)
+    return {'parsed_bytes': end, 'open_row': end < size}
+
+
+class PrefixReader(io.RawIOBase):
+    """Read-only view of the first ``size`` bytes of a binary file.
+
+    Parsers given this view stop at the size the file had when reading
+    started, even if rows are appended while they run. Bytes read are fed
+    to ``digest`` if given, so the disk cache can record the hash of
+    exactly what was parsed without reading the file again.
+    """
+
+    def __init__(self, f, size, digest=None):
+        self.f = f
+        self.remaining = size
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.remaining)
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        if self.digest is not None:
+            self.digest.update(data)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def convert_csv(file_path, columns):
+    """Converts CSV columns into memory-mappable .npy files in the disk cache.
+
+    The CSV is read in chunks, so converting never holds more than
+    CSV_CHUNK_ROWS rows in memory. Already cached columns are skipped.
+    Raises NonNumericColumnError for columns holding text, which the caller
+    parses in memory instead, as for smaller files. Each .npy file is
+    written under a temporary name and renamed into place, so converters
+    running concurrently never truncate a file another process has mapped.
+    """
+    if disk_cache.load_columns(file_path, columns, mmap_mode='r') is not None:
+        return
+    import pandas as pd
+    columns = sorted(set(columns))
+    # Only the bytes present now are converted; rows appended meanwhile are
+    # left for the next conversion or a live follower
+    source_file = open(file_path, 'rb')
+    raw_files = {}
+    try:
+        stat = os.fstat(source_file.fileno())
+        info = parse_info(source_file, stat.st_size)
+        source_file.seek(0)
+        # Raw columns are spooled in the cache directory, on the same disk
+        # as the entry but outside it until the parsed bytes are hashed
+        cache_dir = disk_cache.get_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        raw_files = {col: tempfile.TemporaryFile(dir=cache_dir) for col in columns}
+        n_rows = 0
+        digest = disk_cache.new_digest()
+        text = io.BufferedReader(PrefixReader(source_file, stat.st_size, digest))
+        for chunk in pd.read_csv(text, usecols=columns, chunksize=CSV_CHUNK_ROWS):
+            for position, col in enumerate(columns):
+                raw = chunk.iloc[:, position]
+                values = pd.to_numeric(raw, errors='coerce')
+                # Text would silently become NaN here, unlike in the in-memory path
+                if raw.dtype.kind not in 'biuf' and (values.isna() & raw.notna()).any():
+                    raise NonNumericColumnError(f"column {col + 1} of {file_path} is not numeric")
+                raw_files[col].write(values.to_numpy(np.float64).tobytes())
+            n_rows += len(chunk)
+        directory, meta = disk_cache.open_entry(file_path, stat, digest.hexdigest())
+        meta.update(info)
+        for col, raw in raw_files.items():
+            raw.flush()
+            target = disk_cache.column_path(directory, col)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy.tmp')
+            os.close(fd)
+            try:
+                out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=(n_rows,))
+                if n_rows:
+                    source = np.memmap(raw, dtype=np.float64, mode='r', shape=(n_rows,))
+                    for start in range(0, n_rows, CSV_CHUNK_ROWS):
+                        out[start:start + CSV_CHUNK_ROWS] = source[start:start + CSV_CHUNK_ROWS]
+                    del source
+                out.flush()
+                del out
+                os.replace(tmp_path, target)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        disk_cache.commit_entry(directory, meta, columns)
+    finally:
+        for raw in raw_files.values():
+            raw.close()
+        source_file.close()
+
+
+def prepare_columns(file_path, x_col, y_col):
+    # Runs in the ingestion pool: does the expensive one-off conversion only
+    if not is_mapped_format(file_path):
+        convert_csv(file_path, [x_col, y_col])
+
+
+def map_columns(file_path, x_col, y_col):
+    if is_mapped_format(file_path):
+        array = map_array(file_path)
+        return array[:, x_col], array[:, y_col]
+    mapped = disk_cache.load_columns(file_path, [x_col, y_col], mmap_mode='r')
+    if mapped is None:
+        convert_csv(file_path, [x_col, y_col])
+        mapped = disk_cache.load_columns(file_path, [x_col, y_col], mmap_mode='r')
+        if mapped is None:
+            raise ValueError("could not memory-map converted columns (is the disk cache disabled?)")
+    return PreviewedSeries(*mapped, **disk_cache.read_parse_info(file_path))
@@ -0,0 +1,146 @@
+# plots/normalization.py
+
+import os
+
+import numpy as np
+
+from plots.data_cache import dataset_cache
+from plots.ingestion import load_columns
+
+METHODS = ['None', 'Min-Max', 'Z-Score', 'Area', 'Peak', 'Baseline', 'Reference']
+# Share of the first points used as baseline when no X range is given
+BASELINE_FRACTION = 0.05
+
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+def is_active(settings):
+    return settings is not None and settings.get('method', 'None') != 'None'
+
+
+def parse_range(settings):
+    # Baseline X range from the tab's text fields; None when left empty
+    try:
+        lo = float(settings['baseline_min']) if settings.get('baseline_min') else None
+        hi = float(settings['baseline_max']) if settings.get('baseline_max') else None
+    except ValueError:
+        print("Invalid baseline range values.")
+        return None
+    if lo is None or hi is None:
+        return None
+    return min(lo, hi), max(lo, hi)
+
+
+def safe_divide(a, b):
+    # Rows with a zero (or NaN) scale come out as NaN rather than inf
+    out = np.full(np.broadcast(a, b).shape, np.nan)
+    np.divide(a, b, out=out, where=(b != 0) & np.isfinite(b))
+    return out
+
+
+def normalize_stack(x, y, method, baseline_range=None, reference=None):
+    """Normalizes every row of a 2D stack of series in one pass.
+
+    x and y have shape (n_series, n_points). ``reference`` is the (x, y) of
+    the reference file, interpolated onto each row for 'Reference'.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == 'Min-Max':
+            lo = np.nanmin(y, axis=1, keepdims=True)
+            hi = np.nanmax(y, axis=1, keepdims=True)
+            return safe_divide(y - lo, hi - lo)
+        if method == 'Z-Score':
+            mean = np.nanmean(y, axis=1, keepdims=True)
+            std = np.nanstd(y, axis=1, keepdims=True)
+            return safe_divide(y - mean, std)
+        if method == 'Area':
+            finite = np.where(np.isfinite(y), y, 0.0)
+            area = np.abs(_trapezoid(finite, x, axis=1))[:, None]
+            return safe_divide(y, area)
+        if method == 'Peak':
+            peak = np.nanmax(np.abs(y), axis=1, keepdims=True)
+            return safe_divide(y, peak)
+        if method == 'Baseline':
+            if baseline_range is not None:
+                mask = (x >= baseline_range[0]) & (x <= baseline_range[1])
+            else:
+                mask = np.zeros(y.shape, dtype=bool)
+                mask[:, :max(1, int(y.shape[1] * BASELINE_FRACTION))] = True
+            mask &= np.isfinite(y)
+            counts = mask.sum(axis=1, keepdims=True)
+            baseline = safe_divide(np.where(mask, y, 0.0).sum(axis=1, keepdims=True), counts)
+            return y - baseline
+        if method == 'Reference':
+            ref_x, ref_y = reference
+            order = np.argsort(ref_x, kind='stable')
+            ref_x, ref_y = ref_x[order], ref_y[order]
+            if (x == x[0]).all():
+                # Same X for every row: interpolate the reference once
+                return safe_divide(y, np.interp(x[0], ref_x, ref_y)[None, :])
+            return safe_divide(y, np.vstack([np.interp(row, ref_x, ref_y) for row in x]))
+    raise ValueError(f"Unknown normalization method: {method}")
+
+
+def settings_variant(settings, x_col, y_col):
+    """Cache variant for one parameter set, including the reference file's version."""
+    method = settings['method']
+    variant = ('norm', x_col, y_col, method)
+    if method == 'Baseline':
+        variant += (parse_range(settings),)
+    elif method == 'Reference':
+        reference_file = os.path.abspath(settings['reference_file'])
+        stat = os.stat(reference_file)
+        variant += (reference_file, stat.st_mtime_ns, stat.st_size)
+    return variant
+
+
+def normalize_datasets(data_files, datasets, settings, x_col, y_col):
+    """Returns the datasets with their y normalized as set in the Normalization tab.
+
+    Results are cached per file and parameter set in the dataset cache, so
+    switching back to an earlier method does not recompute. The remaining
+    numeric series are grouped by length, stacked into 2D arrays and
+    normalized one stack at a time. Entries that are None or not (x, y)
+    pairs (e.g. streamed histograms) are returned unchanged.
+    """
+    if not is_active(settings):
+        return datasets
+    method = settings['method']
+    reference = None
+    try:
+        variant = settings_variant(settings, x_col, y_col)
+        if method == 'Reference':
+            reference = tuple(np.asarray(c, dtype=np.float64) for c in
+                              load_columns(settings['reference_file'], x_col, y_col))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading normalization reference: {e}")
+        return datasets
+    baseline_range = parse_range(settings) if method == 'Baseline' else None
+
+    result = list(datasets)
+    pending = {}  # length -> [(index, key)]
+    for i, (file_path, dataset) in enumerate(zip(data_files, datasets)):
+        if not isinstance(dataset, tuple) or len(dataset) != 2:
+            continue
+        x, y = dataset
+        if np.asarray(x).dtype.kind not in 'iuf' or np.asarray(y).dtype.kind not in 'iuf':
+            continue
+        try:
+            key = dataset_cache.make_key(file_path, variant)
+        except OSError:
+            key = None
+        cached = dataset_cache.get(key) if key is not None else None
+        if cached is not None:
+            result[i] = (x, cached)
+        else:
+            pending.setdefault(len(y), []).append((i, key))
+
+    for length, entries in pending.items():
+        x_stack = np.vstack([np.asarray(datasets[i][0], dtype=np.float64) for i, _ in entries])
+        y_stack = np.vstack([np.asarray(datasets[i][1], dtype=np.float64) for i, _ in entries])
+        normalized = normalize_stack(x_stack, y_stack, method, baseline_range, reference)
+        for row, (i, key) in zip(normalized, entries):
+            if key is not None:
+                dataset_cache.put(key, row)
+            result[i] = (datasets[i][0], row)
+    return result
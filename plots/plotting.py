@@ -1,92 +1,177 @@
 # plots/plotting.py
 
-import matplotlib.pyplot as plt
-import pandas as pd
 import os
 
-def plot_data(figure, data_files, plot_details, axis_details, plot_visuals, is_3d=False):
+from plots.ingestion import get_columns, load_columns
+from plots.downsampling import LevelOfDetail
+from plots.streaming import StreamedHistogram
+from plots.profiling import PhaseTimer, span
+from plots.styles import style_context, freeze_tick_style
+from plots.waterfall import Waterfall
+from plots.aggregation import draw_bars, draw_histogram
+from plots.normalization import is_active, normalize_datasets
+
+def load_series(file_path, plot_details, histogram=False):
+    x_col, y_col = get_columns(plot_details)
+    return load_columns(file_path, x_col, y_col, histogram)
+
+def plot_data(figure, data_files, plot_details, axis_details, plot_visuals, is_3d=False, datasets=None, normalization=None,
+              full_resolution=False):
+    # datasets optionally holds preloaded (x, y) pairs aligned with data_files,
+    # with None for files that failed to load. normalization holds the
+    # Normalization tab settings. full_resolution turns off line and scatter
+    # decimation.
+    timer = PhaseTimer('plot_data')
     # Clear the figure
     figure.clear()
+    timer.mark('clear')
+
+    # Load everything up front; normalization works on all series at once
+    if datasets is None:
+        datasets = load_all(data_files, plot_details, histogram=(plot_visuals['plot_type'].lower() == "histogram"))
+        timer.mark('load')
+    if is_active(normalization):
+        try:
+            columns = get_columns(plot_details)
+        except ValueError as e:
+            # Reported like a failed load; the series are drawn as read
+            print(f"Error normalizing data: invalid column number ({e})")
+        else:
+            datasets = normalize_datasets(data_files, datasets, normalization, *columns)
+        timer.mark('normalize')
 
     # Remove the background color settings to keep the plot area white
     # figure.patch.set_facecolor(bg_color)
 
-    # Apply plot style
-    plot_style = plot_visuals['plot_style'].lower()
-    if plot_style == "full_grid":
-        plt.style.use('default')
-        plt.rcParams['grid.color'] = 'black'
-        plt.rcParams['grid.linestyle'] = '-'
-        plt.rcParams['grid.linewidth'] = 0.7
-        plt.rcParams['axes.grid.which'] = 'both'
-        plt.rcParams['xtick.minor.visible'] = True
-        plt.rcParams['ytick.minor.visible'] = True
-    else:
-        try:
-            plt.style.use(plot_style)
-        except Exception as e:
-            print(f"Error applying style '{plot_style}': {e}")
-            plt.style.use('default')
+    # Apply the plot style to this figure only; resolved once per style name
+    with style_context(plot_visuals['plot_style']):
+        timer.mark('style')
 
-    # Prepare the axis
-    ax = figure.add_subplot(111, projection='3d' if is_3d else None)
-    # ax.set_facecolor(bg_color)  # Remove this line to keep default background
+        # Prepare the axis
+        ax = figure.add_subplot(111, projection='3d' if is_3d else None)
+        lod = None if is_3d else LevelOfDetail(ax, full_resolution=full_resolution)
+        waterfall = (Waterfall(ax, point_budget=None) if full_resolution else Waterfall(ax)) if is_3d else None
+        lines = []
+        line_by_file = {}
+        series = []
+        streamed_stats = []
+        plot_type = plot_visuals['plot_type'].lower()
+        # ax.set_facecolor(bg_color)  # Remove this line to keep default background
 
-    # Plot each data file
-    for i, file_path in enumerate(data_files):
-        try:
-            df = pd.read_csv(file_path)
-            x_col = int(plot_details['x_axis_col']) - 1
-            y_col = int(plot_details['y_axis_col']) - 1
-            x = df.iloc[:, x_col]
-            y = df.iloc[:, y_col]
+        # Plot each data file
+        for i, file_path in enumerate(data_files):
+            if datasets[i] is None:
+                continue
+            dataset = datasets[i]
+            if isinstance(dataset, StreamedHistogram):
+                x = y = None
+            else:
+                x, y = dataset
             z = i if is_3d else None
-        except Exception as e:
-            print(f"Error loading file {file_path}: {e}")
-            continue
-
-        label = os.path.splitext(os.path.basename(file_path))[0]
-        line_style = {'Solid': '-', 'Dashed': '--', 'Dash-Dot': '-.'}.get(plot_details['line_style'], '-')
-        point_style = {
-            "None": "",
-            "Circle": "o",
-            "Square": "s",
-            "Triangle Up": "^",
-            "Triangle Down": "v",
-            "Star": "*",
-            "Plus": "+",
-            "Cross": "x"
-        }.get(plot_details['point_style'], "")
-        line_thickness = int(plot_details['line_thickness'])
 
-        plot_type = plot_visuals['plot_type'].lower()
+            label = os.path.splitext(os.path.basename(file_path))[0]
+            line_style, point_style, line_thickness = get_line_style(plot_details)
 
-        if plot_type == "line":
-            if is_3d:
-                ax.plot(x, [z]*len(x), y, label=label, linestyle=line_style, marker=point_style, linewidth=line_thickness)
-            else:
-                ax.plot(x, y, label=label, linestyle=line_style, marker=point_style, linewidth=line_thickness)
-        elif plot_type == "bar":
-            if is_3d:
-                ax.bar(x, y, zs=z, zdir='y', label=label)
-            else:
-                ax.bar(x, y, label=label)
-        elif plot_type == "scatter":
-            if is_3d:
-                ax.scatter(x, [z]*len(x), y, label=label)
-            else:
-                ax.scatter(x, y, label=label)
-        elif plot_type == "histogram":
-            if is_3d:
-                ax.hist(y, zs=z, zdir='y', label=label)
+            if plot_type == "line":
+                if is_3d:
+                    # Drawn together with the other traces after the loop
+                    waterfall.add(x, y, z, label)
+                else:
+                    line = lod.plot(x, y, preview=getattr(dataset, 'preview', None), sorted_x=getattr(dataset, 'sorted_x', None),
+                                    label=label, linestyle=line_style, marker=point_style, linewidth=line_thickness)
+                    series.append((x, y))
+                    lines.append(line)
+                    line_by_file[file_path] = line
+            elif plot_type == "bar":
+                # Long series are grouped or binned to a bounded number of bars
+                draw_bars(ax, x, y, label=label, color=f"C{i}", zs=z)
+            elif plot_type == "scatter":
+                if is_3d:
+                    waterfall.add(x, y, z, label)
+                else:
+                    lod.scatter(x, y, preview=getattr(dataset, 'preview', None), sorted_x=getattr(dataset, 'sorted_x', None),
+                                label=label)
+                    series.append((x, y))
+            elif plot_type == "histogram":
+                if isinstance(dataset, StreamedHistogram):
+                    # Draw the precomputed counts directly
+                    counts, edges, stats = dataset
+                    streamed_stats.append(stats)
+                    draw_histogram(ax, label=label, color=f"C{i}", zs=z, counts=counts, edges=edges)
+                else:
+                    draw_histogram(ax, y, label=label, color=f"C{i}", zs=z)
+            elif plot_type == "pie":
+                if is_3d:
+                    pass  # Pie chart in 3D doesn't make sense
+                else:
+                    ax.pie(y, labels=x)
+        if waterfall is not None and waterfall.traces:
+            line_style, point_style, line_thickness = get_line_style(plot_details)
+            if plot_type == "line":
+                waterfall.draw_lines(linestyle=line_style, linewidth=line_thickness, marker=point_style)
+                lines.extend(waterfall.fallback)
             else:
-                ax.hist(y, label=label)
-        elif plot_type == "pie":
-            if is_3d:
-                pass  # Pie chart in 3D doesn't make sense
-            else:
-                ax.pie(y, labels=x)
+                waterfall.draw_points()
+        timer.mark('artists')
+
+        apply_axis_labels(ax, axis_details, is_3d)
+        if streamed_stats and not is_3d:
+            apply_streamed_limits(ax, streamed_stats)
+        apply_axis_ranges(ax, axis_details)
+        apply_scales(ax, plot_details)
+        apply_grid(ax, plot_visuals)
+        timer.mark('axes')
+        apply_legend(ax, plot_visuals, axis_details)
+        # Create the first ticks while the style is still active
+        freeze_tick_style(ax)
+        timer.mark('legend')
+
+    # Remember what was drawn so cosmetic changes can be applied in place
+    figure.plot_state = {
+        'ax': ax,
+        'lines': lines,
+        'line_by_file': line_by_file,
+        'datasets': list(datasets),
+        'series': series,
+        'data_files': list(data_files),
+        'file_signatures': get_file_signatures(data_files),
+        'is_3d': is_3d,
+        'plot_details': dict(plot_details),
+        'axis_details': dict(axis_details),
+        'plot_visuals': dict(plot_visuals),
+        'normalization': dict(normalization) if normalization else None,
+    }
+
+    # Redraw the figure
+    figure.canvas.draw_idle()
+
+def load_all(data_files, plot_details, histogram=False):
+    datasets = []
+    for file_path in data_files:
+        try:
+            with span('plot_data.load_file', file=file_path):
+                datasets.append(load_series(file_path, plot_details, histogram=histogram))
+        except Exception as e:
+            print(f"Error loading file {file_path}: {e}")
+            datasets.append(None)
+    return datasets
+
+def get_line_style(plot_details):
+    line_style = {'Solid': '-', 'Dashed': '--', 'Dash-Dot': '-.'}.get(plot_details['line_style'], '-')
+    point_style = {
+        "None": "",
+        "Circle": "o",
+        "Square": "s",
+        "Triangle Up": "^",
+        "Triangle Down": "v",
+        "Star": "*",
+        "Plus": "+",
+        "Cross": "x"
+    }.get(plot_details['point_style'], "")
+    line_thickness = int(plot_details['line_thickness'])
+    return line_style, point_style, line_thickness
 
+def apply_axis_labels(ax, axis_details, is_3d):
     # Set axis labels and title with adjusted padding
     ax.set_title(axis_details['title'], fontsize=axis_details['title_font_size'], pad=20)
     ax.set_xlabel(axis_details['x_label'], fontsize=axis_details['axis_font_size'])
@@ -102,7 +187,18 @@ def plot_data(figure, data_files, plot_details, axis_details, plot_visuals, is_3
     # if is_3d:
     #     ax.tick_params(axis='z', colors='black')
 
-    # Apply axis ranges
+def apply_streamed_limits(ax, streamed_stats):
+    # X limits from the running min/max of streamed histograms
+    stats = [s for s in streamed_stats if s is not None and s.count]
+    if not stats:
+        return
+    lo = min(s.min for s in stats)
+    hi = max(s.max for s in stats)
+    margin = ax.margins()[0] * (hi - lo)
+    if hi > lo:
+        ax.set_xlim(lo - margin, hi + margin)
+
+def apply_axis_ranges(ax, axis_details):
     try:
         x_min = float(axis_details['x_min']) if axis_details['x_min'] else None
         x_max = float(axis_details['x_max']) if axis_details['x_max'] else None
@@ -116,7 +212,7 @@ def plot_data(figure, data_files, plot_details, axis_details, plot_visuals, is_3
     except ValueError:
         print("Invalid axis range values.")
 
-    # Apply scales
+def apply_scales(ax, plot_details):
     scale_type = plot_details['scale_type'].lower()
     x_scale = 'linear'
     y_scale = 'linear'
@@ -129,16 +225,111 @@ def plot_data(figure, data_files, plot_details, axis_details, plot_visuals, is_3
     ax.set_xscale(x_scale)
     ax.set_yscale(y_scale)
 
-    # Apply grid settings
+def apply_grid(ax, plot_visuals):
     if plot_visuals['add_grid']:
         ax.grid(True)
     if plot_visuals['add_sub_grid']:
         ax.minorticks_on()
         ax.grid(which='minor', linestyle=':', linewidth='0.5')
 
-    # Add legend if required
+def apply_legend(ax, plot_visuals, axis_details):
+    legend = ax.get_legend()
+    if legend is not None:
+        legend.remove()
     if plot_visuals['apply_legends']:
-        ax.legend(fontsize=axis_details['legend_font_size'])
+        # A waterfall draws all traces as one artist, so its legend uses proxies
+        waterfall = getattr(ax, 'waterfall', None)
+        if waterfall is not None and waterfall.handles:
+            ax.legend(handles=waterfall.handles, fontsize=axis_details['legend_font_size'])
+        else:
+            ax.legend(fontsize=axis_details['legend_font_size'])
+
+def get_file_signatures(data_files):
+    signatures = []
+    for file_path in data_files:
+        try:
+            stat = os.stat(file_path)
+            signatures.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signatures.append(None)
+    return signatures
+
+# Settings that change what is drawn, not just how it looks
+STRUCTURAL_DETAILS = ('x_axis_col', 'y_axis_col')
+STRUCTURAL_VISUALS = ('plot_type', 'plot_style')
+RANGE_KEYS = ('x_min', 'x_max', 'y_min', 'y_max')
+
+def update_plot_in_place(figure, data_files, plot_details, axis_details, plot_visuals, is_3d=False, normalization=None):
+    """Applies cosmetic changes to the figure drawn by the last plot_data call.
+
+    Only the properties whose settings differ from the previous render are
+    touched and the existing artists are reused. Returns False, without
+    changing anything, when the update needs a full plot_data rebuild
+    (different files, columns or normalization, plot type, style, or
+    grid/range removal).
+    """
+    timer = PhaseTimer('update_plot_in_place')
+    state = getattr(figure, 'plot_state', None)
+    if state is None or state['ax'] not in figure.axes or state['is_3d'] != is_3d:
+        return False
+    # A plot drawn while files were still loading lacks their series
+    if state.get('partial'):
+        return False
+    if list(data_files) != state['data_files'] or get_file_signatures(data_files) != state['file_signatures']:
+        return False
+    old_details, old_axis, old_visuals = state['plot_details'], state['axis_details'], state['plot_visuals']
+    if any(plot_details[key] != old_details[key] for key in STRUCTURAL_DETAILS):
+        return False
+    if any(plot_visuals[key] != old_visuals[key] for key in STRUCTURAL_VISUALS):
+        return False
+    if (dict(normalization) if normalization else None) != state['normalization']:
+        return False
+    # Switching grids off or clearing a range has to fall back to the style defaults
+    if (old_visuals['add_grid'] and not plot_visuals['add_grid']) or \
+            (old_visuals['add_sub_grid'] and not plot_visuals['add_sub_grid']):
+        return False
+    ranges_cleared = any(old_axis[key] and not axis_details[key] for key in RANGE_KEYS)
+    if ranges_cleared:
+        return False
+
+    ax = state['ax']
+    waterfall = getattr(ax, 'waterfall', None)
+    # Waterfall markers are a separate scatter, created only when needed
+    if waterfall is not None and waterfall.kind == 'lines' and waterfall.artist is not None and \
+            plot_details['point_style'] != old_details['point_style']:
+        return False
+    legend_dirty = False
+
+    if any(plot_details[key] != old_details[key] for key in ('line_style', 'point_style', 'line_thickness')):
+        line_style, point_style, line_thickness = get_line_style(plot_details)
+        for line in state['lines']:
+            line.set_linestyle(line_style)
+            line.set_marker(point_style)
+            line.set_linewidth(line_thickness)
+        if waterfall is not None:
+            waterfall.set_line_style(line_style, line_thickness)
+        legend_dirty = True
+
+    if any(axis_details[key] != old_axis[key] for key in ('title', 'title_font_size', 'x_label', 'y_label', 'axis_font_size')):
+        apply_axis_labels(ax, axis_details, is_3d)
+
+    if any(axis_details[key] != old_axis[key] for key in RANGE_KEYS):
+        apply_axis_ranges(ax, axis_details)
+
+    if plot_details['scale_type'] != old_details['scale_type']:
+        apply_scales(ax, plot_details)
+
+    if plot_visuals['add_grid'] != old_visuals['add_grid'] or plot_visuals['add_sub_grid'] != old_visuals['add_sub_grid']:
+        apply_grid(ax, plot_visuals)
+
+    if legend_dirty or plot_visuals['apply_legends'] != old_visuals['apply_legends'] or \
+            axis_details['legend_font_size'] != old_axis['legend_font_size']:
+        apply_legend(ax, plot_visuals, axis_details)
+
+    state['plot_details'] = dict(plot_details)
+    state['axis_details'] = dict(axis_details)
+    state['plot_visuals'] = dict(plot_visuals)
+    timer.mark('apply')
 
-    # Redraw the figure
     figure.canvas.draw_idle()
+    return True
@@ -0,0 +1,123 @@
+# plots/profiling.py
+#
+# Lightweight timing spans for the plotting hot paths. The most recent
+# spans are kept in memory for the in-app overlay and can be exported in
+# the Chrome trace event format (chrome://tracing, Perfetto). Setting
+# DATAVIZ_TRACE_LOG=path also appends every span to a JSON-lines log.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_EVENTS = 10000
+
+
+class Tracer:
+    def __init__(self, max_events=MAX_EVENTS, log_path=None):
+        self.events = deque(maxlen=max_events)
+        self.log_path = log_path
+        self.enabled = True
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    def record(self, name, start, end, **args):
+        # start/end are time.perf_counter() values
+        event = {
+            'name': name,
+            'start': start - self._origin,
+            'duration': end - start,
+            'thread': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+            if self.log_path:
+                try:
+                    with open(self.log_path, 'a') as f:
+                        f.write(json.dumps(event) + '\n')
+                except OSError as e:
+                    print(f"Error writing trace log {self.log_path}: {e}")
+                    self.log_path = None
+        for listener in list(self._listeners):
+            listener(event)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def latest(self):
+        # Most recent duration of every span name, in first-seen order
+        with self._lock:
+            events = list(self.events)
+        latest = {}
+        for event in events:
+            latest[event['name']] = event['duration']
+        return latest
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def export_chrome_trace(self, path):
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace = {
+            'traceEvents': [
+                {
+                    'name': event['name'],
+                    'ph': 'X',
+                    'ts': event['start'] * 1e6,
+                    'dur': event['duration'] * 1e6,
+                    'pid': pid,
+                    'tid': event['thread'],
+                    'args': event.get('args', {}),
+                }
+                for event in events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+        with open(path, 'w') as f:
+            json.dump(trace, f)
+
+
+class PhaseTimer:
+    """Records consecutive phases of one function as spans.
+
+    Each ``mark(phase)`` closes the span that started at the previous mark
+    (or at construction) under the name ``"<prefix>.<phase>"``.
+    """
+
+    def __init__(self, prefix, target=None):
+        self.prefix = prefix
+        self.tracer = target if target is not None else tracer
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        if self.tracer.enabled:
+            self.tracer.record(f"{self.prefix}.{phase}", self.last, now)
+        self.last = now
+
+
+tracer = Tracer(log_path=os.environ.get('DATAVIZ_TRACE_LOG'))
+span = tracer.span
@@ -0,0 +1,141 @@
+# plots/project.py
+#
+# Project files: a JSON document (*.dvp) with the file list, panel settings,
+# annotations and text items, next to a "<name>_data" directory with .npy
+# copies of the plotted columns and a min/max preview of each series. On
+# reopen the copies are memory-mapped, so a large session draws at once
+# without parsing the sources again.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from plots.data_cache import dataset_cache
+from plots.disk_cache import write_atomic
+from plots.downsampling import PreviewedSeries, is_monotonic, minmax_downsample
+from plots.ingestion import dataset_variant
+
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = '.dvp'
+# Bins of the stored preview; fine enough for a full-screen axes
+PREVIEW_BINS = 4096
+
+
+def data_dir(project_path):
+    return os.path.splitext(project_path)[0] + '_data'
+
+
+def file_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def save_array(path, values):
+    write_atomic(path, lambda f: np.save(f, np.asarray(values)))
+
+
+def save_project(project_path, session, datasets, columns):
+    """Writes a project file and the binary copies of its datasets.
+
+    ``session`` is the JSON-serializable window state. ``datasets`` maps
+    source paths to (x, y) pairs read with ``columns`` (0-based X/Y column
+    indices); copies that are still current from an earlier save are kept.
+    """
+    directory = data_dir(project_path)
+    os.makedirs(directory, exist_ok=True)
+    previous = {}
+    old = read_project(project_path) if os.path.exists(project_path) else None
+    if old is not None:
+        previous = {entry['path']: entry for entry in old.get('data', [])}
+
+    entries = []
+    for file_path, (x, y) in datasets.items():
+        signature = file_signature(file_path)
+        old_entry = previous.get(file_path)
+        if old_entry is not None and old_entry['signature'] == signature and old_entry['columns'] == list(columns) \
+                and all(os.path.exists(os.path.join(directory, name)) for name in old_entry['arrays'].values()):
+            entries.append(old_entry)
+            continue
+        x, y = np.asarray(x), np.asarray(y)
+        if x.dtype.kind not in 'iuf' or y.dtype.kind not in 'iuf':
+            continue  # Categorical columns are parsed from the source again
+        digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:12]
+        stem = f"{os.path.splitext(os.path.basename(file_path))[0]}_{digest}"
+        preview_x, preview_y = minmax_downsample(x, y, PREVIEW_BINS)
+        arrays = {
+            'x': stem + '_x.npy',
+            'y': stem + '_y.npy',
+            'preview_x': stem + '_preview_x.npy',
+            'preview_y': stem + '_preview_y.npy',
+        }
+        for key, values in zip(('x', 'y', 'preview_x', 'preview_y'), (x, y, preview_x, preview_y)):
+            save_array(os.path.join(directory, arrays[key]), values)
+        entries.append({
+            'path': file_path,
+            'signature': signature,
+            'columns': list(columns),
+            'sorted_x': bool(is_monotonic(x)),
+            'arrays': arrays,
+        })
+
+    # Drop copies no longer referenced by the project
+    kept = {name for entry in entries for name in entry['arrays'].values()}
+    for name in os.listdir(directory):
+        if name.endswith('.npy') and name not in kept:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError as e:
+                print(f"Error removing stale project data {name}: {e}")
+
+    document = dict(session, version=PROJECT_VERSION, data=entries)
+    write_atomic(project_path, lambda f: f.write(json.dumps(document, indent=2).encode('utf-8')))
+
+
+def read_project(project_path):
+    with open(project_path, 'r') as f:
+        document = json.load(f)
+    if document.get('version', 0) > PROJECT_VERSION:
+        raise ValueError(f"project version {document['version']} is newer than supported ({PROJECT_VERSION})")
+    return document
+
+
+def load_project_datasets(project_path, document, columns):
+    """Memory-maps the stored copies of a project's datasets.
+
+    Returns {source path: PreviewedSeries} for the copies read with the
+    same ``columns`` whose source is unchanged since the save, or missing
+    (e.g. a project moved to another machine). Changed sources are left
+    out, so they are parsed again.
+    """
+    directory = data_dir(project_path)
+    datasets = {}
+    for entry in document.get('data', []):
+        if entry['columns'] != list(columns):
+            continue
+        signature = file_signature(entry['path'])
+        if signature is not None and signature != entry['signature']:
+            continue
+        try:
+            arrays = {key: np.load(os.path.join(directory, name), mmap_mode='r')
+                      for key, name in entry['arrays'].items()}
+        except (OSError, ValueError) as e:
+            print(f"Error loading project data for {entry['path']}: {e}")
+            continue
+        datasets[entry['path']] = PreviewedSeries(
+            arrays['x'], arrays['y'], preview=(arrays['preview_x'], arrays['preview_y']), sorted_x=entry['sorted_x'])
+    return datasets
+
+
+def seed_dataset_cache(datasets, columns):
+    # Loads of unchanged sources are then served from the copies
+    for file_path, dataset in datasets.items():
+        try:
+            key = dataset_cache.make_key(file_path, dataset_variant(file_path, *columns))
+        except OSError:
+            continue  # Source missing; only usable as a direct dataset
+        dataset_cache.put(key, dataset)
@@ -0,0 +1,162 @@
+# plots/streaming.py
+#
+# Chunked reading of a single column with running aggregates, so histograms
+# of very large files can be drawn without materializing the data.
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from plots import disk_cache
+from plots.mmap_loader import is_mapped_format, map_array
+
+# Files at least this large are histogrammed by streaming
+STREAM_THRESHOLD = int(os.environ.get('DATAVIZ_STREAM_MB', 256)) * 1024 * 1024
+CHUNK_ROWS = 1000000
+DEFAULT_BINS = 10
+
+StreamedHistogram = namedtuple('StreamedHistogram', ['counts', 'edges', 'stats'])
+
+
+class RunningStats:
+    """Count, sum, min and max of the finite values seen so far."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.count += len(values)
+            self.total += float(values.sum())
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+
+class AdaptiveHistogram:
+    """Single-pass histogram whose equal-width bins grow to fit the data.
+
+    When a chunk falls outside the current edges, the bin width is doubled
+    by merging neighbouring bins, so the counts stay exact with respect to
+    the final edges. Used for columns parsed from CSV text, which would
+    otherwise be parsed twice (once for the range, once for the counts).
+    """
+
+    def __init__(self, bins=DEFAULT_BINS):
+        self.bins = bins + bins % 2
+        self.origin = None
+        self.width = None
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+
+    def update(self, values):
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        lo, hi = float(values.min()), float(values.max())
+        if self.origin is None:
+            self.origin = lo
+            self.width = (hi - lo) / self.bins if hi > lo else max(abs(lo), 1.0) * 1e-3
+        while lo < self.origin or hi > self.origin + self.width * self.bins:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            padding = np.zeros(self.bins // 2, dtype=np.int64)
+            if lo < self.origin:
+                self.origin -= self.width * self.bins
+                self.counts = np.concatenate([padding, merged])
+            else:
+                self.counts = np.concatenate([merged, padding])
+            self.width *= 2
+        index = np.floor((values - self.origin) / self.width).astype(np.int64)
+        self.counts += np.bincount(np.clip(index, 0, self.bins - 1), minlength=self.bins)
+
+    @property
+    def edges(self):
+        return self.origin + self.width * np.arange(self.bins + 1)
+
+    def result(self):
+        if self.origin is None:
+            # No finite values; same empty bins as the fixed-edges path
+            return self.counts, np.linspace(0.0, 1.0, self.bins + 1)
+        # Empty bins at either end only widen the plot
+        filled = np.nonzero(self.counts)[0]
+        if not len(filled):
+            return self.counts, self.edges
+        first, last = filled[0], filled[-1] + 1
+        return self.counts[first:last], self.edges[first:last + 1]
+
+
+def should_stream(file_path):
+    if is_mapped_format(file_path):
+        return True
+    try:
+        return os.path.getsize(file_path) >= STREAM_THRESHOLD
+    except OSError:
+        return False
+
+
+def mapped_column(file_path, col):
+    # The column from a mapped file or the disk cache, or None if it has to
+    # be parsed from the CSV text
+    if is_mapped_format(file_path):
+        return map_array(file_path)[:, col]
+    cached = disk_cache.load_columns(file_path, [col], mmap_mode='r')
+    return cached[0] if cached is not None else None
+
+
+def iter_column_chunks(file_path, col, chunk_rows=CHUNK_ROWS, column=None):
+    # Yields float64 chunks of one column from a mapped file, the disk cache
+    # or, failing both, the CSV text itself
+    if column is None:
+        column = mapped_column(file_path, col)
+    if column is not None:
+        for start in range(0, len(column), chunk_rows):
+            yield np.asarray(column[start:start + chunk_rows], dtype=np.float64)
+        return
+    import pandas as pd
+    for chunk in pd.read_csv(file_path, usecols=[col], chunksize=chunk_rows):
+        yield pd.to_numeric(chunk.iloc[:, 0], errors='coerce').to_numpy(np.float64)
+
+
+def stream_histogram(file_path, col, bins=DEFAULT_BINS, bin_range=None):
+    """Histograms one column of a file chunk by chunk.
+
+    Mapped and disk-cached columns are cheap to read twice: a first pass
+    finds the range, unless ``bin_range`` is given, and a second pass
+    counts, so the result matches ``np.histogram`` on the whole column.
+    A column that has to be parsed from CSV text is read only once, through
+    AdaptiveHistogram, which refines the edges as it goes.
+    """
+    column = mapped_column(file_path, col)
+    stats = RunningStats()
+    if column is None and bin_range is None:
+        histogram = AdaptiveHistogram(bins)
+        for chunk in iter_column_chunks(file_path, col):
+            stats.update(chunk)
+            histogram.update(chunk)
+        counts, edges = histogram.result()
+        return StreamedHistogram(counts, edges, stats)
+
+    if bin_range is None:
+        for chunk in iter_column_chunks(file_path, col, column=column):
+            stats.update(chunk)
+        bin_range = (stats.min, stats.max) if stats.count else (0.0, 1.0)
+        collect = False
+    else:
+        collect = True
+    lo, hi = bin_range
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    for chunk in iter_column_chunks(file_path, col, column=column):
+        if collect:
+            stats.update(chunk)
+        counts += np.histogram(chunk[np.isfinite(chunk)], bins=edges)[0]
+    return StreamedHistogram(counts, edges, stats)
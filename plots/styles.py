@@ -0,0 +1,68 @@
+# plots/styles.py
+
+import contextlib
+from functools import lru_cache
+
+import matplotlib
+import matplotlib.style
+
+# Extra settings of the "full_grid" style, on top of the defaults
+FULL_GRID_RC = {
+    'grid.color': 'black',
+    'grid.linestyle': '-',
+    'grid.linewidth': 0.7,
+    'axes.grid.which': 'both',
+    'xtick.minor.visible': True,
+    'ytick.minor.visible': True,
+}
+
+# Settings a style must not change (backend, interactivity, ...)
+try:
+    from matplotlib.style.core import STYLE_BLACKLIST
+except ImportError:
+    STYLE_BLACKLIST = {'backend', 'interactive', 'toolbar', 'timezone', 'figure.max_open_warning'}
+
+
+@lru_cache(maxsize=None)
+def resolve_style(plot_style):
+    """Returns the rcParams a style changes relative to the defaults.
+
+    The result is computed once per style name. Styles renamed by newer
+    Matplotlib releases (e.g. "seaborn" -> "seaborn-v0_8") are looked up
+    under their new name, and unknown styles fall back to the defaults.
+    """
+    name = plot_style.lower()
+    if name == "full_grid":
+        settings = FULL_GRID_RC
+    elif name == "default":
+        settings = {}
+    else:
+        library = matplotlib.style.library
+        key = next((k for k in (name, f"{name}-v0_8") if k in library), None)
+        if key is None:
+            print(f"Error applying style '{plot_style}': style not found")
+            settings = {}
+        else:
+            settings = library[key]
+    defaults = matplotlib.rcParamsDefault
+    return {
+        key: value for key, value in settings.items()
+        if key not in STYLE_BLACKLIST and (key not in defaults or defaults[key] != value)
+    }
+
+
+def style_context(plot_style):
+    """Scoped application of a style, leaving the global rcParams untouched."""
+    settings = resolve_style(plot_style)
+    if not settings:
+        return contextlib.nullcontext()
+    return matplotlib.rc_context(settings)
+
+
+def freeze_tick_style(ax):
+    # Ticks are created lazily at draw time, after the style context has
+    # ended; creating the first ones now makes the rest copy this style
+    axes = [ax.xaxis, ax.yaxis] + ([ax.zaxis] if hasattr(ax, 'zaxis') else [])
+    for axis in axes:
+        axis.get_major_ticks(1)
+        axis.get_minor_ticks(1)
@@ -0,0 +1,188 @@
+# plots/table_source.py
+#
+# Row-addressable views over data files for the data structure viewer.
+# Sources only read what has been asked for: a CSV is parsed one chunk at
+# a time as the view scrolls, mapped files are sliced on demand.
+
+import io
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+
+from plots.mmap_loader import is_mapped_format, map_array
+
+CHUNK_ROWS = 1000
+# Parsed CSV chunks kept per source; older ones are read again if revisited
+CACHE_CHUNKS = 50
+
+
+class TableSource:
+    # Interface shared by all sources
+    columns = []
+    dtypes = []
+
+    def loaded_rows(self):
+        raise NotImplementedError
+
+    def can_fetch_more(self):
+        return False
+
+    def fetch_more(self):
+        return 0
+
+    def value(self, row, col):
+        raise NotImplementedError
+
+    def total_rows(self):
+        # None while unknown (e.g. a CSV that has not been counted yet)
+        return self.loaded_rows()
+
+    def close(self):
+        pass
+
+
+class ArrayTableSource(TableSource):
+    def __init__(self, array, columns=None):
+        self.array = array
+        self.columns = columns or [f"Column {i + 1}" for i in range(array.shape[1])]
+        self.dtypes = [str(array.dtype)] * array.shape[1]
+
+    def loaded_rows(self):
+        return self.array.shape[0]
+
+    def value(self, row, col):
+        return self.array[row, col]
+
+
+class CsvTableSource(TableSource):
+    """Reads windows of a CSV on demand, chunk_rows rows at a time.
+
+    chunk_offsets holds the byte offset of every chunk_rows-th data row.
+    It grows as chunks are fetched in order, and set_index fills it for the
+    whole file from the background row scan, after which any window is read
+    with a single seek. Only the last cache_chunks parsed chunks are kept.
+    """
+
+    def __init__(self, file_path, chunk_rows=CHUNK_ROWS, cache_chunks=CACHE_CHUNKS):
+        import pandas as pd
+        self.file_path = file_path
+        self.chunk_rows = chunk_rows
+        self.cache_chunks = cache_chunks
+        self.chunks = OrderedDict()
+        self.file = open(file_path, 'rb')
+        try:
+            header = self.file.readline()
+            self.columns = [str(col) for col in pd.read_csv(io.BytesIO(header)).columns]
+            self.chunk_offsets = [self.file.tell()]
+            self.row_count = 0
+            self.known_total = None
+            self.fetch_more()
+        except Exception:
+            self.file.close()
+            raise
+        first = self.chunk(0) if self.row_count else None
+        if first is None:
+            self.dtypes = ['object'] * len(self.columns)
+        else:
+            self.dtypes = [str(dtype) for dtype in first.dtypes]
+
+    def loaded_rows(self):
+        return self.row_count if self.known_total is None else self.known_total
+
+    def can_fetch_more(self):
+        return self.known_total is None
+
+    def fetch_more(self):
+        if self.known_total is not None:
+            return 0
+        frame = self.chunk(len(self.chunk_offsets) - 1)
+        self.row_count += len(frame)
+        if len(frame) < self.chunk_rows:
+            self.known_total = self.row_count
+        return len(frame)
+
+    def chunk(self, index):
+        if index in self.chunks:
+            self.chunks.move_to_end(index)
+            return self.chunks[index]
+        frame = self.read_chunk(index)
+        self.chunks[index] = frame
+        while len(self.chunks) > self.cache_chunks:
+            self.chunks.popitem(last=False)
+        return frame
+
+    def read_chunk(self, index):
+        import pandas as pd
+        self.file.seek(self.chunk_offsets[index])
+        lines = list(islice(self.file, self.chunk_rows))
+        if len(lines) == self.chunk_rows and index + 1 == len(self.chunk_offsets):
+            self.chunk_offsets.append(self.file.tell())
+        if not lines:
+            return pd.DataFrame(columns=range(len(self.columns)))
+        # Blank lines are kept so rows stay aligned with the newline scan
+        return pd.read_csv(
+            io.BytesIO(b''.join(lines)), header=None, names=range(len(self.columns)),
+            index_col=False, skip_blank_lines=False
+        )
+
+    def value(self, row, col):
+        frame = self.chunk(row // self.chunk_rows)
+        local = row % self.chunk_rows
+        if local >= len(frame):
+            # The file shrank after it was indexed
+            return ''
+        return frame.iat[local, col]
+
+    def total_rows(self):
+        return self.known_total
+
+    def set_index(self, total, chunk_offsets):
+        self.known_total = total
+        self.chunk_offsets = chunk_offsets
+        self.chunks.clear()
+
+    def close(self):
+        self.file.close()
+
+
+def open_table_source(file_path):
+    if is_mapped_format(file_path):
+        return ArrayTableSource(map_array(file_path))
+    return CsvTableSource(file_path)
+
+
+def index_csv_rows(file_path, chunk_rows=CHUNK_ROWS, block_size=16 * 1024 * 1024, is_cancelled=None):
+    """Counts the data rows of a CSV by scanning for newlines, without parsing.
+
+    Returns the row count and the byte offset of every chunk_rows-th data
+    row, which CsvTableSource uses to read any window directly. Returns
+    None if a truthy ``is_cancelled()`` stopped the scan.
+    """
+    offsets = []
+    lines = 0
+    position = 0
+    last = b'\n'
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            if is_cancelled is not None and is_cancelled():
+                return None
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            # Data row r starts after newline number r + 1 (the header ends at the first)
+            first = len(offsets) * chunk_rows - lines
+            starts = newlines[first::chunk_rows] + position + 1
+            offsets.extend(starts.tolist())
+            lines += len(newlines)
+            position += len(block)
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    total = max(lines - 1, 0)
+    return total, offsets[:(total + chunk_rows - 1) // chunk_rows]
+
+
+def describe_source(source):
+    total = source.total_rows()
+    rows = f"{total:,}" if total is not None else "counting..."
+    return f"{len(source.columns)} columns, {rows} rows"
+
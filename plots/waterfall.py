@@ -0,0 +1,151 @@
+# plots/waterfall.py
+
+import matplotlib
+import numpy as np
+from matplotlib.colors import to_rgba_array
+from matplotlib.lines import Line2D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from plots.downsampling import MIN_BINS, grid_downsample, minmax_downsample
+
+# Upper bound on the points drawn over all traces of one waterfall
+POINT_BUDGET = 1000000
+
+
+class Waterfall:
+    """3D waterfall of many series drawn as a single collection.
+
+    Traces are collected with ``add`` and drawn together by ``draw_lines`` or
+    ``draw_points``: every trace is decimated to its share of the point
+    budget, packed into one contiguous (n, 3) array and handed to a single
+    Line3DCollection (or one 3D scatter), instead of one artist per file.
+    The data x runs along the x axis, the trace offset along y and the data
+    y along z, as in the per-file plots this replaces.
+    """
+
+    def __init__(self, ax, point_budget=POINT_BUDGET):
+        self.ax = ax
+        self.point_budget = point_budget
+        self.traces = []  # (x, y, offset, label)
+        self.artist = None
+        self.markers = None
+        self.kind = None
+        self.handles = []
+        self.fallback = []  # per-trace artists when the data cannot be packed
+        ax.waterfall = self
+
+    def add(self, x, y, offset, label):
+        self.traces.append((np.asarray(x), np.asarray(y), offset, label))
+
+    def is_numeric(self):
+        return all(x.dtype.kind in 'iuf' and y.dtype.kind in 'iuf' for x, y, _, _ in self.traces)
+
+    def bins_per_trace(self):
+        # Each min/max bin keeps two points; no trace needs more bins than
+        # the figure is wide. Without a budget nothing is decimated.
+        if self.point_budget is None:
+            return max(len(x) for x, _, _, _ in self.traces)
+        width = int(self.ax.figure.bbox.width) if self.ax.figure.bbox.width > 0 else 0
+        share = self.point_budget // (2 * max(len(self.traces), 1))
+        return max(min(share, max(width, MIN_BINS)), MIN_BINS)
+
+    def pack(self, spatial=False):
+        """Returns the decimated traces as one (n, 3) array and their lengths.
+
+        Lines keep the min/max of index bins; ``spatial`` (scatter) traces
+        keep one point per cell of a grid over their x/y plane instead, so
+        unsorted point clouds keep their shape.
+        """
+        n_bins = self.bins_per_trace()
+        if not spatial:
+            reduced = [minmax_downsample(x, y, n_bins) for x, y, _, _ in self.traces]
+        elif self.point_budget is None:
+            reduced = [(x, y) for x, y, _, _ in self.traces]
+        else:
+            # About as many cells as the two points of every min/max bin
+            side = max(int(np.sqrt(2 * n_bins)), 1)
+            reduced = [grid_downsample(x, y, side, side) for x, y, _, _ in self.traces]
+        lengths = np.array([len(x) for x, _ in reduced], dtype=np.intp)
+        points = np.empty((int(lengths.sum()), 3), dtype=np.float64)
+        start = 0
+        for (x, y), (_, _, offset, _), length in zip(reduced, self.traces, lengths):
+            block = points[start:start + length]
+            block[:, 0] = x
+            block[:, 1] = offset
+            block[:, 2] = y
+            start += length
+        return points, lengths
+
+    def colors(self):
+        # One colour per trace from the active style's property cycle
+        cycle = matplotlib.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+        return to_rgba_array([cycle[i % len(cycle)] for i in range(len(self.traces))])
+
+    def draw_lines(self, linestyle='-', linewidth=1, marker=''):
+        if not self.traces:
+            return None
+        self.kind = 'lines'
+        if not self.is_numeric():
+            return self.draw_each('plot', linestyle=linestyle, linewidth=linewidth, marker=marker)
+        had_data = self.ax.has_data()
+        points, lengths = self.pack()
+        colors = self.colors()
+        # The segments are views into the packed array, not copies
+        segments = np.split(points, np.cumsum(lengths)[:-1])
+        self.artist = Line3DCollection(segments, colors=colors, linestyles=linestyle, linewidths=linewidth)
+        self.ax.add_collection3d(self.artist)
+        if marker:
+            self.markers = self.ax.scatter(points[:, 0], points[:, 1], points[:, 2], marker=marker,
+                                           c=np.repeat(colors, lengths, axis=0), depthshade=False)
+        self.autoscale(points, had_data)
+        self.handles = [
+            Line2D([], [], color=color, linestyle=linestyle, linewidth=linewidth, marker=marker, label=label)
+            for color, (_, _, _, label) in zip(colors, self.traces)
+        ]
+        return self.artist
+
+    def draw_points(self):
+        if not self.traces:
+            return None
+        self.kind = 'points'
+        if not self.is_numeric():
+            return self.draw_each('scatter')
+        points, lengths = self.pack(spatial=True)
+        colors = self.colors()
+        self.artist = self.ax.scatter(points[:, 0], points[:, 1], points[:, 2], c=np.repeat(colors, lengths, axis=0))
+        self.handles = [
+            Line2D([], [], color=color, linestyle='', marker='o', label=label)
+            for color, (_, _, _, label) in zip(colors, self.traces)
+        ]
+        return self.artist
+
+    def draw_each(self, method, **kwargs):
+        # Non-numeric columns (categories, dates) cannot be packed; draw them
+        # one artist per trace as before
+        self.fallback = []
+        for x, y, offset, label in self.traces:
+            artist = getattr(self.ax, method)(x, np.full(len(x), offset), y, label=label, **kwargs)
+            self.fallback.extend(artist if isinstance(artist, list) else [artist])
+        self.handles = []
+        return None
+
+    def autoscale(self, points, had_data):
+        # Collections added directly do not update the data limits
+        points = points[np.isfinite(points).all(axis=1)]
+        if not len(points):
+            return
+        lo = points.min(axis=0)
+        hi = points.max(axis=0)
+        self.ax.auto_scale_xyz([lo[0], hi[0]], [lo[1], hi[1]], [lo[2], hi[2]], had_data=had_data)
+
+    def set_line_style(self, linestyle, linewidth):
+        # Cosmetic update of an existing line waterfall
+        if self.kind != 'lines':
+            # Point waterfalls and their marker-only legend proxies have no lines
+            return
+        if isinstance(self.artist, Line3DCollection):
+            self.artist.set_linestyle(linestyle)
+            self.artist.set_linewidth(linewidth)
+        for handle in self.handles:
+            handle.set_linestyle(linestyle)
+            handle.set_linewidth(linewidth)